@@ -8,7 +8,10 @@ from cachetools import TTLCache
 import pandas as pd
 from typing import Optional
 import sys
-sys.stdout.reconfigure(encoding='utf-8')
+import logging
+from collection_bot import setup_logging
+
+logger = logging.getLogger("collection_bot.test_bot")  # Shares the bot's queued log handler
 
 
 # Constants
@@ -80,9 +83,9 @@ def retry_request(url, max_retries=3, delay=2):
             if response.status_code == 200:
                 return response.json()
             else:
-                print(f"⚠️ API Error {response.status_code}: {response.text}")
+                logger.warning("⚠️ API Error %s: %s", response.status_code, response.text)
         except requests.exceptions.RequestException as e:
-            print(f"⚠️ Request failed (Attempt {attempt+1}/{max_retries}): {e}")
+            logger.warning("⚠️ Request failed (Attempt %d/%d): %s", attempt + 1, max_retries, e)
         time.sleep(delay)
     return None  # Return None if all retries fail
 
@@ -114,7 +117,7 @@ def get_token_pairs(chain_id, token_address):
     data = retry_request(url)
 
     if not data:
-        print(f"❌ No data received for {token_address}")
+        logger.warning("❌ No data received for %s", token_address)
         return []
 
     # ✅ Fix: API returns a list, so we extract pairs from each item
@@ -125,17 +128,17 @@ def get_token_pairs(chain_id, token_address):
                 pairs.append(item)
 
     if pairs:
-        print(f"✅ Found {len(pairs)} pairs for {token_address}: {pairs}")
+        logger.debug("✅ Found %d pairs for %s: %s", len(pairs), token_address, pairs)
         return pairs
 
-    print(f"⚠️ No pairs found for {token_address} (API returned empty or unexpected format)")
+    logger.info("⚠️ No pairs found for %s (API returned empty or unexpected format)", token_address)
     return []
 
 
 
 
 def save_token_data(token_data):
-    print(f" DEBUG: Attempting to save token: {token_data}")
+    logger.debug("Attempting to save token: %s", token_data)
 
     try:
         conn = psycopg2.connect(
@@ -144,7 +147,7 @@ def save_token_data(token_data):
         cursor = conn.cursor()
 
         # Debugging: Check if DB connection works
-        print(" Connected to the database")
+        logger.debug("Connected to the database")
 
         # Check if the token exists in DB
         cursor.execute("SELECT market_cap_at_dex_paid, highest_market_cap FROM tokens WHERE token_name = %s", 
@@ -164,7 +167,7 @@ def save_token_data(token_data):
 
             if new_highest_mc > highest_market_cap:
                 new_ath_time = datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S UTC')
-                print(f"📈 Updating {token_data.get('tokenName')} - New ATH: {new_highest_mc} at {new_ath_time}")
+                logger.info("📈 Updating %s - New ATH: %s at %s", token_data.get("tokenName"), new_highest_mc, new_ath_time)
 
                 cursor.execute("""
                     UPDATE tokens 
@@ -175,12 +178,12 @@ def save_token_data(token_data):
                 conn.commit()
 
             else:
-                print(f" Skipping {token_data.get('tokenName')} - No new highest market cap.")
+                logger.debug("Skipping %s - No new highest market cap.", token_data.get("tokenName"))
 
             return  # Exit function if token already exists
 
         # If the token is new, insert it
-        print(f" Inserting {token_data.get('tokenName')} into DB...")
+        logger.debug("Inserting %s into DB...", token_data.get("tokenName"))
 
         cursor.execute("""
             INSERT INTO tokens (token_name, symbol, market_cap_at_dex_paid, highest_market_cap, pair_created_at, dex_paid_at, ath_timestamp)
@@ -196,10 +199,10 @@ def save_token_data(token_data):
         ))
 
         conn.commit()
-        print(f" ✅ Successfully saved {token_data.get('tokenName')} to the database.")
+        logger.info("✅ Successfully saved %s to the database.", token_data.get("tokenName"))
 
     except Exception as e:
-        print(f" ❌ ERROR: Failed to save token to DB - {e}")
+        logger.error("❌ Failed to save token to DB - %s", e)
 
     finally:
         if cursor:
@@ -233,7 +236,7 @@ def track_price_changes(token_address, token_name, duration=6, interval=1):
             conn.commit()
 
         except Exception as e:
-            print(f"ERROR: Failed to track price for {token_name} - {e}")
+            logger.error("❌ Failed to track price for %s - %s", token_name, e)
 
         finally:
             if cursor:
@@ -248,7 +251,7 @@ def track_price_changes(token_address, token_name, duration=6, interval=1):
 def inspect_token_profiles(token_profiles):
     global tokens_scanned, dex_paid_sniped, latest_dex_paid_time
     
-    print(f"DEBUG: Inspecting {len(token_profiles)} token profiles...")  # ADDED
+    logger.debug("Inspecting %d token profiles...", len(token_profiles))
 
     for profile in token_profiles:
         tokens_scanned += 1
@@ -256,10 +259,10 @@ def inspect_token_profiles(token_profiles):
         chain_id = profile.get("chainId")
 
         if not token_address or not chain_id or chain_id != TARGET_CHAIN_ID:
-            print(f"DEBUG: Skipping {token_address} (Invalid Chain or Missing Address)")
+            logger.debug("Skipping %s (Invalid Chain or Missing Address)", token_address)
             continue
 
-        print(f"DEBUG: Checking {token_address} on {chain_id}")  # ADDED
+        logger.debug("Checking %s on %s", token_address, chain_id)
 
         if token_address not in already_paid_dex_tokens:
             paid, dex_paid_details = is_dex_paid(chain_id, token_address)
@@ -267,7 +270,7 @@ def inspect_token_profiles(token_profiles):
             paid, dex_paid_details = False, None  # Ensure paid is always defined
 
         if paid:
-            print(f"  {token_address} is DEX PAID!")
+            logger.info("💰 %s is DEX PAID!", token_address)
 
             # Add token to the cache
             already_paid_dex_tokens[token_address] = datetime.now()
@@ -277,7 +280,7 @@ def inspect_token_profiles(token_profiles):
 
             pairs = get_token_pairs(chain_id, token_address)
             if not pairs:
-                print(f"  No pairs found for {token_address}, skipping database save.")
+                logger.info("No pairs found for %s, skipping database save.", token_address)
                 continue  # ✅ Use continue instead of return
 
             pair_data = pairs[0]  # ✅ Correctly placed outside if block
@@ -289,9 +292,9 @@ def inspect_token_profiles(token_profiles):
             token_name = pair_data.get("baseToken", {}).get("name")
             market_cap = pair_data.get("marketCap", 0)
 
-            print(f"DEBUG: Token Name: {token_name}, Market Cap: {market_cap}, Pair Created: {pair_created_at}, Dex Paid: {dex_paid_at}")
+            logger.debug("Token Name: %s, Market Cap: %s, Pair Created: %s, Dex Paid: %s", token_name, market_cap, pair_created_at, dex_paid_at)
 
-            print(f"DEBUG: Calling save_token_data() for {token_name}")
+            logger.debug("Calling save_token_data() for %s", token_name)
             save_token_data({
                 "tokenName": token_name,
                 "tokenSymbol": pair_data.get("baseToken", {}).get("symbol"),
@@ -308,7 +311,7 @@ def inspect_token_profiles(token_profiles):
 
 # Main execution loop
 def main():
-    print("Dex Paid Token Bot Started...")
+    logger.info("Dex Paid Token Bot Started...")
     while True:
         token_profiles = get_latest_token_profiles()
         if token_profiles:
@@ -316,4 +319,5 @@ def main():
         time.sleep(1)
 
 if __name__ == "__main__":
+    setup_logging(logging.DEBUG)  # Debug variant: payload dumps are on, truncated by the formatter
     main()
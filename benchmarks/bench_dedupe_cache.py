@@ -0,0 +1,89 @@
+"""
+Dedupe cache benchmark: memory per token and lookup cost of CompactAddressSet, with and without its
+Bloom pre-filter, against the previous TTLCache (string keys, datetime values).
+
+    python benchmarks/bench_dedupe_cache.py --count 100000 --json before.json
+    python benchmarks/bench_dedupe_cache.py --baseline before.json   # exits 1 on regressions
+"""
+import gc
+import itertools
+import os
+import random
+import sys
+import tracemalloc
+from datetime import datetime
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+from cachetools import TTLCache
+
+from collection_bot import CompactAddressSet, key_to_base58
+from harness import Case, argument_parser, run
+
+SEED = 1234  # Same addresses every run, so probe lengths don't vary between runs
+
+
+def random_addresses(rng, count):
+    return [key_to_base58(rng.randbytes(32)) for _ in range(count)]
+
+
+def build_ttlcache(encoded):
+    cache = TTLCache(maxsize=500000, ttl=3600)
+    for address in encoded:
+        # Fresh string objects, as they would arrive from each poll's JSON
+        cache["".join(address)] = datetime.now()
+    return cache
+
+
+def build_compact(encoded, bloom):
+    cache = CompactAddressSet(maxsize=500000, ttl=3600, bloom=bloom)
+    for address in encoded:
+        cache.add(address)
+    return cache
+
+
+def measure_memory(build):
+    gc.collect()
+    tracemalloc.start()
+    cache = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return cache, current
+
+
+def main():
+    parser = argument_parser(__doc__.strip().splitlines()[0])
+    parser.add_argument("--count", type=int, default=100000, help="Tokens inserted into each cache")
+    args = parser.parse_args()
+
+    rng = random.Random(SEED)
+    encoded = random_addresses(rng, args.count)
+    misses = random_addresses(rng, 10000)
+
+    candidates = [
+        ("CompactAddressSet", lambda: build_compact(encoded, bloom=True)),
+        ("CompactAddressSet no Bloom", lambda: build_compact(encoded, bloom=False)),
+        ("TTLCache (previous)", lambda: build_ttlcache(encoded)),
+    ]
+
+    print(f"{args.count} tokens")
+    print(f"{'cache':<28}{'MB':>9}{'bytes/token':>14}")
+    cases = []
+    for name, build in candidates:
+        cache, memory = measure_memory(build)
+        print(f"{name:<28}{memory / 1e6:>9.2f}{memory / args.count:>14.1f}")
+        hits = itertools.cycle(encoded[:10000])
+        missed = itertools.cycle(misses)
+        cases += [
+            Case(f"dedupe: {name} hit", lambda cache=cache, hits=hits: next(hits) in cache, batch=100),
+            # Fresh string objects, as they arrive from each poll's JSON, so hash(address) isn't cached
+            Case(f"dedupe: {name} miss", lambda cache=cache, missed=missed: "".join(next(missed)) in cache, batch=100),
+        ]
+    print()
+    run(cases, args)
+
+
+if __name__ == "__main__":
+    main()
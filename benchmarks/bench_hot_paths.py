@@ -0,0 +1,205 @@
+"""
+Micro-benchmarks for the collection hot paths, on fixed fixtures and without network access:
+payload parsing in get_token_pairs / is_dex_paid, building the saved token row, dedupe lookups and the
+DB write paths. The DB cases never touch the bot's tables: they only run when BENCH_DB_SCHEMA
+(a schema in the bot's database, created if missing) or BENCH_DB_NAME (a separate database)
+is set.
+
+    python benchmarks/bench_hot_paths.py --json before.json
+    python benchmarks/bench_hot_paths.py --baseline before.json   # exits 1 on regressions
+    BENCH_DB_SCHEMA=bench python benchmarks/bench_hot_paths.py
+"""
+import itertools
+import os
+import random
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+import psycopg2
+import requests
+
+import collection_bot
+from collection_bot import (CompactAddressSet, NotPaidCache, PriceBatchWriter, RateLimiter, TokenSnapshot,
+                            decode_orders, decode_pairs, get_token_pairs, is_dex_paid, key_to_base58, save_token_data)
+from harness import Case, argument_parser, run
+
+FIXTURES_DIR = os.path.join(BENCH_DIR, "fixtures")
+BENCH_ADDRESS_PREFIX = "bench-"  # Rows written by the DB cases, removed afterwards
+BENCH_DB_NAME = os.environ.get("BENCH_DB_NAME")  # Separate database for the DB cases
+BENCH_DB_SCHEMA = os.environ.get("BENCH_DB_SCHEMA")  # Or a separate schema in the bot's database
+PRICE_FLUSH_ROWS = 500
+DEDUPE_ENTRIES = 100000
+SEED = 1234  # Same addresses every run, so probe lengths don't vary between runs
+
+
+class FixtureHTTPClient:
+    """
+    Answers every URL with a canned requests.Response, so parsing runs the real response.json() path.
+    """
+
+    def __init__(self):
+        self.routes = {}
+
+    def route(self, path_fragment, fixture):
+        response = requests.models.Response()
+        response.status_code = 200
+        response.encoding = "utf-8"
+        with open(os.path.join(FIXTURES_DIR, fixture), "rb") as f:
+            response._content = f.read()
+        self.routes[path_fragment] = response
+
+    def get(self, url, timeout=5):
+        for path_fragment, response in self.routes.items():
+            if path_fragment in url:
+                return response
+        raise requests.exceptions.ConnectionError(f"No fixture for {url}")
+
+    def pool_stats(self):
+        return {}
+
+    def close(self):
+        pass
+
+
+def install_fixtures():
+    client = FixtureHTTPClient()
+    client.route("/token-pairs/v1/", "token_pairs.json")
+    client.route("/orders/v1/solana/paid", "orders_paid.json")
+    client.route("/orders/v1/solana/unpaid", "orders_unpaid.json")
+    collection_bot.http_client = client
+    # Keep the token buckets in the measured path, but never let them wait
+    collection_bot.rate_limiter = RateLimiter(limits={}, default_limit=1e12)
+
+
+def parsing_cases():
+    install_fixtures()
+    return [
+        Case("parse: get_token_pairs (3 pairs)", lambda: get_token_pairs("solana", "token"), batch=10),
+        Case("parse: is_dex_paid (paid)", lambda: is_dex_paid("solana", "paid"), batch=10),
+        Case("parse: is_dex_paid (unpaid)", lambda: is_dex_paid("solana", "unpaid"), batch=10),
+    ]
+
+
+def snapshot_cases():
+    # The row save_dex_paid_token builds; timestamps stay epoch ms until Postgres converts them on insert
+    with open(os.path.join(FIXTURES_DIR, "token_pairs.json"), "rb") as f:
+        pair = decode_pairs(f.read())[0]
+    with open(os.path.join(FIXTURES_DIR, "orders_paid.json"), "rb") as f:
+        order = decode_orders(f.read())[0]
+    return [
+        Case("snapshot: TokenSnapshot.from_pair", lambda: TokenSnapshot.from_pair(pair, order), batch=100),
+    ]
+
+
+def dedupe_cases():
+    rng = random.Random(SEED)
+    known = [key_to_base58(rng.randbytes(32)) for _ in range(DEDUPE_ENTRIES)]
+    unknown = [key_to_base58(rng.randbytes(32)) for _ in range(10000)]
+    cache = CompactAddressSet(maxsize=DEDUPE_ENTRIES * 2)
+    for address in known:
+        cache.add(address)
+
+    not_paid = NotPaidCache()
+    for address in unknown:
+        not_paid.record_not_paid(address)
+
+    hits = itertools.cycle(known[:10000])
+    misses = itertools.cycle(unknown)
+    rechecks = itertools.cycle(unknown)
+    return [
+        Case("dedupe: CompactAddressSet hit", lambda: next(hits) in cache, batch=100),
+        Case("dedupe: CompactAddressSet miss", lambda: next(misses) in cache, batch=100),
+        Case("dedupe: NotPaidCache.should_check", lambda: not_paid.should_check(next(rechecks)), batch=100),
+    ]
+
+
+def use_bench_database():
+    """
+    Points the bot's pool at BENCH_DB_NAME and/or BENCH_DB_SCHEMA. Returns False, leaving it untouched,
+    when neither is set or they would resolve to the bot's own tables.
+    """
+    if not BENCH_DB_SCHEMA and (not BENCH_DB_NAME or BENCH_DB_NAME == collection_bot.DB_NAME):
+        print("Skipping DB benchmarks: set BENCH_DB_SCHEMA or BENCH_DB_NAME so they don't write to the bot's tables")
+        return False
+    if BENCH_DB_NAME:
+        collection_bot.DB_NAME = BENCH_DB_NAME
+    if BENCH_DB_SCHEMA:
+        conn = psycopg2.connect(dbname=collection_bot.DB_NAME, user=collection_bot.DB_USER, password=collection_bot.DB_PASSWORD,
+                                host=collection_bot.DB_HOST, port=collection_bot.DB_PORT)
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute(f'CREATE SCHEMA IF NOT EXISTS "{BENCH_DB_SCHEMA}"')
+            conn.commit()
+        finally:
+            conn.close()
+        # libpq applies PGOPTIONS to every connection the pool opens
+        os.environ["PGOPTIONS"] = f"-c search_path={BENCH_DB_SCHEMA}"
+    return True
+
+
+def database_available():
+    try:
+        if not use_bench_database():
+            return False
+        collection_bot.init_db()
+        return True
+    except Exception as e:
+        print(f"Skipping DB benchmarks, no usable Postgres at {collection_bot.DB_HOST}:{collection_bot.DB_PORT} ({e})")
+        return False
+
+
+def database_cases():
+    sequence = itertools.count()
+    timestamp = time.time_ns() // 1_000_000
+
+    def token(address):
+        return TokenSnapshot(address, "Bench Token", "BNCH", 50000.0, timestamp, timestamp)
+
+    existing = f"{BENCH_ADDRESS_PREFIX}existing"
+    save_token_data(token(existing))
+    rows = [("Bench Token", existing, timestamp, 0.0001)] * PRICE_FLUSH_ROWS
+    writer = PriceBatchWriter()
+    return [
+        Case("db: save_token_data (insert)", lambda: save_token_data(token(f"{BENCH_ADDRESS_PREFIX}{next(sequence)}")), samples=200),
+        Case("db: save_token_data (no new high)", lambda: save_token_data(token(existing)), samples=200),
+        Case(f"db: price flush ({PRICE_FLUSH_ROWS} rows)", lambda: writer._flush(rows), samples=50),
+    ]
+
+
+def remove_database_rows():
+    with collection_bot.db_pool.connection() as conn, conn.cursor() as cursor:
+        pattern = BENCH_ADDRESS_PREFIX + "%"
+        if collection_bot.PRICE_STORAGE_MODE == "partitioned":
+            cursor.execute("""
+                DELETE FROM price_ticks
+                WHERE token_id IN (SELECT id FROM tokens WHERE contract_address LIKE %s)
+            """, (pattern,))
+        else:
+            cursor.execute("DELETE FROM prices WHERE token_address LIKE %s", (pattern,))
+        cursor.execute("DELETE FROM tokens WHERE contract_address LIKE %s", (pattern,))
+        conn.commit()
+
+
+def main():
+    parser = argument_parser(__doc__.strip().splitlines()[0])
+    parser.add_argument("--no-db", action="store_true", help="Skip the Postgres write benchmarks")
+    args = parser.parse_args()
+
+    cases = parsing_cases() + snapshot_cases() + dedupe_cases()
+    use_db = not args.no_db and database_available()
+    if use_db:
+        cases += database_cases()
+
+    try:
+        run(cases, args)
+    finally:
+        if use_db:
+            remove_database_rows()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Pairs payload decoding: the previous response.json() + dict path against decode_pairs with msgspec,
+orjson and json, for a single-token token-pairs/v1 body and a 30-token tokens/v1 batch.
+Reports time per response and bytes allocated (peak) and retained per response.
+
+    python benchmarks/bench_json_decode.py
+"""
+import gc
+import json
+import os
+import sys
+import tracemalloc
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+import requests
+
+import collection_bot
+from collection_bot import decode_pairs, project_pairs
+from harness import Case, argument_parser, run
+
+FIXTURES_DIR = os.path.join(BENCH_DIR, "fixtures")
+
+
+def load_payloads():
+    with open(os.path.join(FIXTURES_DIR, "token_pairs.json"), "rb") as f:
+        single = f.read()
+
+    # tokens/v1 batch: the same pairs for 30 distinct base tokens
+    pairs = json.loads(single)
+    batch = []
+    for index in range(collection_bot.TOKENS_BATCH_SIZE):
+        for pair in pairs:
+            pair = json.loads(json.dumps(pair))
+            pair["baseToken"]["address"] = f"{pair['baseToken']['address'][:-2]}{index:02d}"
+            batch.append(pair)
+    return {"3 pairs": single, "30 tokens": json.dumps(batch).encode("utf-8")}
+
+
+def previous_path(content):
+    """
+    What get_token_pairs did before: Response.json() into dicts, then filter on marketCap.
+    """
+    response = requests.models.Response()
+    response._content = content
+    response.encoding = "utf-8"
+    data = response.json()
+    return [item for item in data if isinstance(item, dict) and "marketCap" in item]
+
+
+def decoders():
+    candidates = [("response.json() dicts", previous_path)]
+    if collection_bot._pairs_decoder is not None:
+        candidates.append(("decode_pairs msgspec", decode_pairs))
+    if collection_bot.orjson is not None:
+        candidates.append(("orjson + projection", lambda content: project_pairs(collection_bot.orjson.loads(content))))
+    candidates.append(("json + projection", lambda content: project_pairs(json.loads(content))))
+    return candidates
+
+
+def measure_allocations(decode, content, repeat=20):
+    """
+    Returns (peak bytes while decoding, bytes still held by the result), averaged over `repeat` decodes.
+    """
+    gc.collect()
+    tracemalloc.start()
+    peak_total = 0
+    retained_total = 0
+    for _ in range(repeat):
+        tracemalloc.reset_peak()
+        before, _ = tracemalloc.get_traced_memory()
+        result = decode(content)
+        current, peak = tracemalloc.get_traced_memory()
+        peak_total += peak - before
+        retained_total += current - before
+        del result
+    tracemalloc.stop()
+    return peak_total / repeat, retained_total / repeat
+
+
+def main():
+    parser = argument_parser(__doc__.strip().splitlines()[0])
+    args = parser.parse_args()
+
+    payloads = load_payloads()
+    candidates = decoders()
+    if collection_bot._pairs_decoder is None:
+        print("msgspec not installed; decode_pairs falls back to generic parsing")
+
+    print(f"{'decoder':<26}{'payload':>12}{'bytes in':>10}{'peak KB':>10}{'retained KB':>13}")
+    for name, decode in candidates:
+        for payload_name, content in payloads.items():
+            peak, retained = measure_allocations(decode, content)
+            print(f"{name:<26}{payload_name:>12}{len(content):>10}{peak / 1024:>10.1f}{retained / 1024:>13.1f}")
+    print()
+
+    cases = []
+    for payload_name, content in payloads.items():
+        for name, decode in candidates:
+            cases.append(Case(f"{name} ({payload_name})", lambda decode=decode, content=content: decode(content),
+                              batch=10 if len(content) < 20000 else 1))
+    run(cases, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""
+Shared runner for the benchmark scripts: per-op latency percentiles, ops/sec, JSON output and
+comparison against a saved baseline.
+"""
+import argparse
+import gc
+import json
+import platform
+import sys
+import time
+from datetime import datetime, timezone
+
+DEFAULT_SAMPLES = 2000
+DEFAULT_WARMUP = 100
+DEFAULT_TOLERANCE = 0.15  # Flag a case when ops/sec drops or p99 grows by more than this share
+
+
+class Case:
+    """
+    One benchmark: `func` is called `batch` times per timed sample. Use batch > 1 for operations
+    too fast to time one at a time; percentiles are then over per-op averages within a sample.
+    """
+
+    def __init__(self, name, func, batch=1, samples=None):
+        self.name = name
+        self.func = func
+        self.batch = batch
+        self.samples = samples
+
+
+def percentile(sorted_values, share):
+    index = min(len(sorted_values) - 1, max(0, round(share * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def run_case(case, samples=DEFAULT_SAMPLES, warmup=DEFAULT_WARMUP):
+    func, batch = case.func, case.batch
+    samples = case.samples or samples
+    for _ in range(min(warmup, samples)):
+        func()
+
+    timings = []
+    gc_was_enabled = gc.isenabled()
+    gc.disable()  # Collections land on whichever sample happens to trigger them
+    try:
+        for _ in range(samples):
+            start = time.perf_counter_ns()
+            for _ in range(batch):
+                func()
+            timings.append((time.perf_counter_ns() - start) / batch)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+    total_ns = sum(timings)
+    timings.sort()
+    return {
+        "name": case.name,
+        "ops": samples * batch,
+        "ops_per_sec": samples * 1e9 / total_ns if total_ns else float("inf"),
+        "p50_ns": percentile(timings, 0.50),
+        "p99_ns": percentile(timings, 0.99),
+    }
+
+
+def format_ns(ns):
+    for unit, scale in (("s", 1e9), ("ms", 1e6), ("µs", 1e3)):
+        if ns >= scale:
+            return f"{ns / scale:.2f} {unit}"
+    return f"{ns:.0f} ns"
+
+
+def print_results(results, baseline=None):
+    print(f"{'benchmark':<44}{'ops/sec':>14}{'p50':>12}{'p99':>12}{'vs baseline':>14}")
+    for result in results:
+        change = ""
+        previous = (baseline or {}).get(result["name"])
+        if previous:
+            change = f"{result['ops_per_sec'] / previous['ops_per_sec'] - 1:+.1%}"
+        print(f"{result['name']:<44}{result['ops_per_sec']:>14,.0f}{format_ns(result['p50_ns']):>12}"
+              f"{format_ns(result['p99_ns']):>12}{change:>14}")
+
+
+def load_baseline(path):
+    with open(path, encoding="utf-8") as f:
+        return {result["name"]: result for result in json.load(f)["results"]}
+
+
+def find_regressions(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    regressions = []
+    for result in results:
+        previous = baseline.get(result["name"])
+        if not previous:
+            continue
+        if result["ops_per_sec"] < previous["ops_per_sec"] * (1 - tolerance):
+            regressions.append(f"{result['name']}: ops/sec {previous['ops_per_sec']:,.0f} -> {result['ops_per_sec']:,.0f}")
+        if result["p99_ns"] > previous["p99_ns"] * (1 + tolerance):
+            regressions.append(f"{result['name']}: p99 {format_ns(previous['p99_ns'])} -> {format_ns(result['p99_ns'])}")
+    return regressions
+
+
+def write_results(results, path):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({
+            "recorded_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "results": results,
+        }, f, indent=2)
+
+
+def add_arguments(parser):
+    parser.add_argument("--samples", type=int, default=DEFAULT_SAMPLES, help="Timed samples per benchmark")
+    parser.add_argument("--filter", default=None, help="Only run benchmarks whose name contains this text")
+    parser.add_argument("--json", metavar="PATH", help="Write results as JSON (usable as a later --baseline)")
+    parser.add_argument("--baseline", metavar="PATH", help="Compare against a previous --json run")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="Allowed ops/sec drop or p99 growth before a case counts as a regression")
+
+
+def run(cases, args):
+    """
+    Runs the cases selected by `args`, prints a table, writes JSON and exits 1 on regressions.
+    """
+    baseline = load_baseline(args.baseline) if args.baseline else None
+    results = []
+    for case in cases:
+        if args.filter and args.filter not in case.name:
+            continue
+        results.append(run_case(case, samples=args.samples))
+
+    print_results(results, baseline)
+    if args.json:
+        write_results(results, args.json)
+
+    if baseline:
+        regressions = find_regressions(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) beyond {args.tolerance:.0%}:")
+            for regression in regressions:
+                print(f"  {regression}")
+            sys.exit(1)
+    return results
+
+
+def argument_parser(description):
+    parser = argparse.ArgumentParser(description=description)
+    add_arguments(parser)
+    return parser
@@ -1,14 +1,47 @@
+import argparse
+import asyncio
+import atexit
+import queue
+import sqlite3
+import math
+import multiprocessing
+import os
+import signal
+import socket
+from array import array
 import requests
+from requests.adapters import HTTPAdapter
 import csv
 import psycopg2
+import psycopg2.extensions
+import psycopg2.extras
 from datetime import datetime, timezone, timedelta
 import time
+import heapq
+import itertools
 import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from collections import OrderedDict
+from urllib.parse import urlsplit
 from cachetools import TTLCache
 import pandas as pd
-from typing import Optional
+from typing import Optional, Union
+from dataclasses import dataclass
+import json
 import sys
-sys.stdout.reconfigure(encoding='utf-8')
+import logging
+import logging.handlers
+try:
+    import msgspec  # Optional: typed, projecting decoder for pairs payloads
+except ImportError:
+    msgspec = None
+try:
+    import orjson  # Optional: faster generic JSON parsing when msgspec isn't installed
+except ImportError:
+    orjson = None
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from dexscreener_replay import ReplayHTTPClient, TrafficRecorder
 
 
 # Constants
@@ -16,349 +49,2676 @@ PERIOD = 60
 WSOL_ADDRESS = 'So11111111111111111111111111111111111111112'
 DATA_FILE = "dex_paid_tracked_data.csv"
 PRICE_TRACK_FILE = "price_tracking_data.csv"
-DEXSCREENER_API_BASE_URL = "https://api.dexscreener.com"
+DEXSCREENER_LIVE_API_URL = "https://api.dexscreener.com"
+DEXSCREENER_API_BASE_URL = os.environ.get("DEXSCREENER_API_BASE_URL", DEXSCREENER_LIVE_API_URL).rstrip("/")  # Override to target a stand-in
 TARGET_CHAIN_ID = "solana"
 MAX_MARKET_CAP = 100000  # Filter for tokens under 100K MC
+TOKENS_BATCH_SIZE = 30  # Max addresses the tokens/v1 endpoint accepts per request
+ASYNC_INGESTION = True  # Fan out DEX-paid checks concurrently instead of one by one
+DEX_PAID_CHECK_CONCURRENCY = 16  # Max in-flight orders/v1 requests per batch
+FAST_JSON_DECODE = True  # Decode pairs payloads with msgspec/orjson when installed, else the json module
+
+# Not-paid recheck backoff
+NOT_PAID_RECHECK_DELAYS = (5, 15, 60, 300)  # Seconds before each successive recheck of an unpaid token
+NOT_PAID_MAX_RECHECK_DELAY = 300  # A late payment is noticed at most this many seconds after it lands
+NOT_PAID_CACHE_TTL = 6 * 3600  # Forget unpaid tokens not seen for this long
+NOT_PAID_CACHE_MAXSIZE = 500000
+
+# Latest-profiles feed diffing
+FEED_FINGERPRINT_FIELDS = ("chainId", "tokenAddress", "url", "icon", "header", "description", "links")
+FEED_SEEN_MAXSIZE = 100000  # Profiles remembered between polls (least recently seen evicted first)
+
+# Adaptive polling cadence
+POLL_MIN_INTERVAL = 0.5  # Seconds; fastest we poll token-profiles/latest during launch bursts
+POLL_MAX_INTERVAL = 5.0  # Seconds; slowest we poll when the feed is quiet
+POLL_TARGET_NEW_PER_POLL = 1.0  # Aim for about this many new profiles per poll
+POLL_RATE_SMOOTHING = 0.3  # EWMA weight of the latest observed launch rate
+
+# HTTP connection pooling
+HTTP_POOL_CONNECTIONS = 4  # Number of per-host pools kept alive
+HTTP_POOL_MAXSIZE = 32  # Max keep-alive connections per host
+HTTP_POOL_BLOCK = True  # Wait for a free connection instead of opening extras past the per-host limit
+
+# DexScreener rate limits, requests per minute per endpoint family
+RATE_LIMITS = {
+    "token-profiles": 60,
+    "orders": 60,
+    "token-pairs": 300,
+    "tokens": 300,
+}
+RATE_LIMIT_DEFAULT = 60
+RATE_LIMIT_USERS = {  # Which processes call each family, for splitting a host's quota between them
+    "token-profiles": ("detector",),
+    "orders": ("detector",),
+    "token-pairs": ("detector", "worker"),  # Pair resolution on the detector, price ticks on workers
+    "tokens": ("worker",),  # ATH batches
+}
+RATE_LIMIT_BURST_SECONDS = 10  # Bucket capacity, in seconds' worth of quota
+
+# Priority lanes, lower value wins when quota is tight
+PRIORITY_DETECTION = 0  # Latest profiles, orders checks and pair lookups for new launches
+PRIORITY_TRACKING = 1  # Price ticks for tracked tokens
+PRIORITY_BACKGROUND = 2  # ATH refresh sweeps
+RATE_LIMIT_LANE_RESERVE = {  # Share of each bucket a lane leaves untouched for higher lanes
+    PRIORITY_DETECTION: 0.0,
+    PRIORITY_TRACKING: 0.2,
+    PRIORITY_BACKGROUND: 0.5,
+}
+
+# Tracking scheduler
+TRACKING_WORKERS = 4  # Worker threads that run due tracking ticks
+
+# Deferred pair resolution
+PAIR_RESOLUTION_DELAYS = (1, 3, 10)  # Seconds after detection at which pairs are looked up
+PAIR_RESOLUTION_WORKERS = 2  # Own pool, so lookups never queue behind price ticks
+
+# Tiered ATH refresh
+ATH_TIERS = ("hot", "warm", "cold", "dormant")
+ATH_TIER_INTERVALS = {"hot": 5, "warm": 30, "cold": 300, "dormant": 3600}  # Seconds between refreshes per tier
+ATH_TIER_MAX_AGES = (3600, 24 * 3600, 7 * 24 * 3600, 30 * 24 * 3600)  # Seconds since DEX paid per tier; older tokens retire
+ATH_VOLATILE_MOVE = 0.10  # Smoothed relative move per refresh that makes a token one tier hotter
+ATH_VOLATILITY_SMOOTHING = 0.5
+ATH_NEAR_HIGH_SHARE = 0.8  # Trading above this share of its ATH: one tier hotter
+ATH_FAR_FROM_HIGH_SHARE = 0.1  # Quiet and below this share of its ATH: one tier colder
+ATH_TICK_INTERVAL = 1.0  # Seconds between checks for due tokens
+ATH_RELOAD_INTERVAL = 60  # Seconds between syncs with the tokens table
+
+# Price tracking window per DEX paid token
+PRICE_TRACK_HOURS = 6
+PRICE_TRACK_INTERVAL_MINUTES = 1
+
+# Sharded tracking (--role worker / --workers)
+LEASE_TTL = 30  # Seconds a worker's claim on a token survives without renewal; also the heartbeat timeout
+LEASE_RENEW_INTERVAL = 5  # Seconds between heartbeat, renew and rebalance rounds
+LEASE_SYNC_INTERVAL = 60  # Seconds between backfilling leases for active tokens and dropping retired ones
+
+# Logging
+LOG_LEVEL = logging.INFO
+LOG_FORMAT = "%(asctime)s %(levelname)s %(processName)s/%(threadName)s: %(message)s"
+LOG_MAX_MESSAGE_CHARS = 500  # Longer messages (e.g. raw API payloads) are truncated
+LOG_QUEUE_SIZE = 10000  # Records waiting for the writer thread; extras are dropped, not blocked on
+
+# Metrics
+METRICS_HOST = "127.0.0.1"
+METRICS_PORT = 9108  # Prometheus scrape endpoint at http://METRICS_HOST:METRICS_PORT/metrics (None disables it)
+METRICS_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)  # Seconds
+REPLAY_DETECTION_BUCKETS = (1, 2, 5, 10, 30, 60, 120, 300, 600)  # Seconds of replayed time
+
+# PostgreSQL Database Credentials (each overridable from the environment, e.g. for stand-in and replay runs)
+LIVE_DB_NAME = "solana_bot"
+DB_NAME = os.environ.get("DB_NAME", LIVE_DB_NAME)
+DB_SCHEMA = os.environ.get("DB_SCHEMA")  # Keep the bot's tables in this schema instead of the default search_path
+DB_USER = os.environ.get("DB_USER", "bot_user")
+DB_PASSWORD = os.environ.get("DB_PASSWORD", "Topdog")
+DB_HOST = os.environ.get("DB_HOST", "localhost")
+DB_PORT = os.environ.get("DB_PORT", "5432")
+DB_POOL_MAX_SIZE = 10
+DB_POOL_HEALTHCHECK_IDLE = 30  # Ping connections idle longer than this (seconds) before handing them out
+
+# Price write-behind buffer
+PRICE_BATCH_MAX_ROWS = 500  # Flush once this many ticks are buffered...
+PRICE_BATCH_MAX_DELAY = 2.0  # ...or once the oldest buffered tick is this old (seconds)
+PRICE_BUFFER_MAX_ROWS = 50000  # Memory bound; producers wait, then drop, past this
+PRICE_BUFFER_PUT_TIMEOUT = 1.0
+
+# Price storage
+PRICE_STORAGE_MODE = "legacy"  # "legacy" = single prices heap, "partitioned" = daily price_ticks partitions
+PRICE_PARTITIONS_AHEAD = 3  # Daily partitions created ahead of time
+PRICE_RETENTION_DAYS = 30  # Partitions entirely older than this are dropped (None keeps everything)
+PRICE_MAINTENANCE_INTERVAL = 3600  # Seconds between partition create/retention runs
+
+# Warm-start dedupe state
+LIVE_DEDUPE_STATE_FILE = "dedupe_state.sqlite3"
+DEDUPE_STATE_FILE = os.environ.get("DEDUPE_STATE_FILE", LIVE_DEDUPE_STATE_FILE)
+DEDUPE_TTL = 3600  # Seconds a handled token stays deduped, in memory and on disk
+
+# Dedupe cache
+DEDUPE_CACHE_MAXSIZE = 500000
+DEDUPE_BLOOM_FILTER = True  # Bloom pre-filter on the raw address string, so most misses skip the base58 decode
+DEDUPE_BLOOM_ERROR_RATE = 0.01
+
+BASE58_ALPHABET = "123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz"
+# Byte -> base58 digit, 255 for bytes outside the alphabet
+_BASE58_DIGITS = bytes(BASE58_ALPHABET.index(chr(byte)) if chr(byte) in BASE58_ALPHABET else 255 for byte in range(256))
+
+
+def base58_to_key(address):
+    """
+    Decodes a base58 Solana address to its 32 raw bytes. Returns None for anything that isn't one.
+    """
+    try:
+        digits = address.encode("ascii").translate(_BASE58_DIGITS)
+    except UnicodeEncodeError:
+        return None
+    if 255 in digits:
+        return None
+
+    value = 0
+    for digit in digits:
+        value = value * 58 + digit
+
+    try:
+        key = value.to_bytes(32, "big")
+    except OverflowError:
+        return None
+
+    # Canonical encodings have exactly one leading '1' per leading zero byte
+    if len(digits) - len(digits.lstrip(b"\0")) != 32 - len(key.lstrip(b"\0")):
+        return None
+    return key
+
+
+def key_to_base58(key):
+    value = int.from_bytes(key, "big")
+    chars = []
+    while value:
+        value, digit = divmod(value, 58)
+        chars.append(BASE58_ALPHABET[digit])
+    leading_zeros = len(key) - len(key.lstrip(b"\0"))
+    return "1" * leading_zeros + "".join(reversed(chars))
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter over address strings, double hashing on the two halves of hash(address).
+    The hash is per process, which is fine for a filter that only lives in memory.
+    """
+
+    def __init__(self, capacity, error_rate=DEDUPE_BLOOM_ERROR_RATE):
+        self.num_bits = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self._bits = bytearray((self.num_bits + 7) // 8)
+
+    def add(self, address):
+        h = hash(address)
+        h1, h2 = h & 0xFFFFFFFF, (h >> 32) & 0xFFFFFFFF | 1
+        bits, num_bits = self._bits, self.num_bits
+        for i in range(self.num_hashes):
+            position = (h1 + i * h2) % num_bits
+            bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, address):
+        h = hash(address)
+        h1, h2 = h & 0xFFFFFFFF, (h >> 32) & 0xFFFFFFFF | 1
+        bits, num_bits = self._bits, self.num_bits
+        for i in range(self.num_hashes):
+            position = (h1 + i * h2) % num_bits
+            if not bits[position >> 3] & (1 << (position & 7)):
+                return False
+        return True
+
+    def memory_bytes(self):
+        return len(self._bits)
+
+
+class CompactAddressSet:
+    """
+    TTL dedupe cache that stores addresses as 32-byte keys in flat arrays instead of Python strings.
+    Open addressing with linear probing over one bytearray of keys and one uint32 array of insert times;
+    expired entries read as absent and are purged when the table has to grow. Once `maxsize` live entries
+    are held, the oldest tenth is evicted. Addresses that aren't base58 public keys fall back to a small dict.
+
+    With `bloom`, lookups first check a Bloom filter on the address string and most misses return before the
+    decode. Bloom filters can't delete, so there are two generations rotated every `ttl`: an address stays in
+    the filter for at least `ttl` after it was added, longer than it can stay live in the table.
+    """
+
+    MIN_CAPACITY = 1024
+    MAX_LOAD = 0.75
+
+    def __init__(self, maxsize=DEDUPE_CACHE_MAXSIZE, ttl=DEDUPE_TTL, bloom=DEDUPE_BLOOM_FILTER,
+                 error_rate=DEDUPE_BLOOM_ERROR_RATE):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.error_rate = error_rate
+        self._lock = threading.Lock()
+        self._other = {}
+        self._allocate(self.MIN_CAPACITY)
+        # (current, previous), swapped as one tuple so lookups never see a half-rotated pair
+        self._blooms = (BloomFilter(maxsize, error_rate), BloomFilter(maxsize, error_rate)) if bloom else None
+        self._bloom_rotated_at = time.time()
+
+    def _allocate(self, capacity):
+        self.capacity = capacity
+        self._mask = capacity - 1
+        self._keys = bytearray(capacity * 32)
+        self._times = array("I", bytes(capacity * 4))  # 0 = empty slot
+        self._count = 0
+
+    def _find(self, key):
+        """
+        Slot holding `key`, or the empty slot where it would go.
+        """
+        keys, times, mask = self._keys, self._times, self._mask
+        slot = int.from_bytes(key[:8], "little") & mask
+        while times[slot] and keys[slot * 32:slot * 32 + 32] != key:
+            slot = (slot + 1) & mask
+        return slot
+
+    def _insert(self, key, seen_at):
+        slot = self._find(key)
+        if not self._times[slot]:
+            self._count += 1
+            self._keys[slot * 32:slot * 32 + 32] = key
+        self._times[slot] = seen_at
+
+    def _rebuild(self, now):
+        """
+        Drops expired entries, evicts the oldest past maxsize and re-sizes the table for the rest.
+        """
+        live = []
+        for slot in range(self.capacity):
+            seen_at = self._times[slot]
+            if seen_at and now - seen_at < self.ttl:
+                live.append((seen_at, bytes(self._keys[slot * 32:slot * 32 + 32])))
+
+        if len(live) >= self.maxsize:
+            # Evict the oldest tenth in one go so a full cache doesn't rebuild on every add
+            live.sort()
+            live = live[len(live) - int(self.maxsize * 0.9):]
+
+        capacity = self.MIN_CAPACITY
+        while len(live) + 1 > capacity * self.MAX_LOAD / 1.5:
+            capacity *= 2  # Leave headroom so the next rebuild is a while away
+        self._allocate(capacity)
+        for seen_at, key in live:
+            self._insert(key, seen_at)
+
+        self._other = {address: seen_at for address, seen_at in self._other.items() if now - seen_at < self.ttl}
+
+    def add(self, address, seen_at=None):
+        """
+        Marks `address` as seen at `seen_at` (epoch seconds, default now).
+        """
+        now = time.time()
+        seen_at = max(1, int(seen_at if seen_at is not None else now))
+        key = base58_to_key(address)
+        with self._lock:
+            if self._blooms is not None:
+                if now - self._bloom_rotated_at >= self.ttl:
+                    self._blooms = (BloomFilter(self.maxsize, self.error_rate), self._blooms[0])
+                    self._bloom_rotated_at = now
+                self._blooms[0].add(address)
+            if key is None:
+                self._other[address] = seen_at
+                return
+            if self._count + 1 > self.capacity * self.MAX_LOAD or self._count >= self.maxsize:
+                self._rebuild(int(time.time()))
+            self._insert(key, seen_at)
+
+    def __contains__(self, address):
+        blooms = self._blooms
+        if blooms is not None and address not in blooms[0] and address not in blooms[1]:
+            return False
+        now = time.time()
+        key = base58_to_key(address)
+        if key is None:
+            seen_at = self._other.get(address)
+            return seen_at is not None and now - seen_at < self.ttl
+
+        with self._lock:
+            seen_at = self._times[self._find(key)]
+        return bool(seen_at) and now - seen_at < self.ttl
+
+    def __len__(self):
+        return self._count + len(self._other)
+
+    def memory_bytes(self):
+        size = len(self._keys) + self._times.itemsize * len(self._times)
+        if self._blooms is not None:
+            size += sum(bloom.memory_bytes() for bloom in self._blooms)
+        return size
 
-# PostgreSQL Database Credentials
-DB_NAME = "solana_bot"
-DB_USER = "bot_user"
-DB_PASSWORD = "Topdog"
-DB_HOST = "localhost"
-DB_PORT = "5432"
 
 # Globals
-already_paid_dex_tokens = TTLCache(maxsize=500000, ttl=3600)
+logger = logging.getLogger("collection_bot")
+already_paid_dex_tokens = CompactAddressSet()
 tokens_scanned = 0
 dex_paid_sniped = 0
 latest_dex_paid_time = None
+counters_lock = threading.Lock()
+sharded_tracking = False  # True when worker processes lease and track tokens instead of this one
+dex_paid_check_executor = ThreadPoolExecutor(max_workers=DEX_PAID_CHECK_CONCURRENCY, thread_name_prefix="dex-paid-check")
+
+class TruncatingFormatter(logging.Formatter):
+    """
+    Caps the message part of each record at LOG_MAX_MESSAGE_CHARS.
+    """
+
+    def __init__(self, fmt=LOG_FORMAT, max_chars=LOG_MAX_MESSAGE_CHARS):
+        super().__init__(fmt)
+        self.max_chars = max_chars
+
+    def formatMessage(self, record):
+        if len(record.message) > self.max_chars:
+            hidden = len(record.message) - self.max_chars
+            record.message = f"{record.message[:self.max_chars]}... [{hidden} chars truncated]"
+        return super().formatMessage(record)
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """
+    Hands records to the writer thread without ever waiting: a full queue drops the record.
+    """
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        # Only merge the args; formatting and truncation happen on the writer thread
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def setup_logging(level=LOG_LEVEL):
+    """
+    Routes the bot's logs through a bounded queue to one background thread that writes stdout,
+    so the scan loop never blocks on terminal I/O.
+    """
+    if hasattr(sys.stdout, "reconfigure"):
+        sys.stdout.reconfigure(encoding="utf-8")  # Emoji-safe on Windows consoles
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(TruncatingFormatter())
+
+    log_queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+    logger.handlers[:] = [NonBlockingQueueHandler(log_queue)]
+    logger.setLevel(level)
+    logger.propagate = False
+
+    global log_listener
+    stop_logging()
+    listener = log_listener = logging.handlers.QueueListener(log_queue, stream_handler)
+    listener.start()
+    return listener
+
+
+def stop_logging():
+    """
+    Writes out queued records and stops the log listener.
+    """
+    global log_listener
+    if log_listener is not None:
+        log_listener.stop()
+        log_listener = None
+
+log_listener = None
+# Registered before every other exit handler, so it runs last and their log lines still get written
+atexit.register(stop_logging)
+
+
+def exit_on_sigterm():
+    """
+    Turns SIGTERM, which service managers stop the bot with, into SystemExit so the exit handlers
+    (price flush, lease release, log drain) run as they do on Ctrl-C.
+    """
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(128 + signum))
+
+
+class Metrics:
+    """
+    Minimal thread-safe metrics registry rendered in the Prometheus text format.
+    Counters and histograms are updated in place; gauges are callbacks read at scrape time.
+    """
+
+    def __init__(self, buckets=METRICS_LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._meta = {}  # name -> (type, help), in registration order
+        self._counters = {}  # (name, labels) -> value
+        self._histograms = {}  # (name, labels) -> [per-bucket counts..., +Inf count, sum]
+        self._gauges = {}  # name -> callable
+        self._bucket_overrides = {}  # name -> buckets, for histograms outside the latency range
+
+    def counter(self, name, help_text):
+        self._meta.setdefault(name, ("counter", help_text))
+
+    def histogram(self, name, help_text, buckets=None):
+        self._meta.setdefault(name, ("histogram", help_text))
+        if buckets is not None:
+            self._bucket_overrides[name] = tuple(buckets)
+
+    def gauge(self, name, help_text, func, kind="gauge", label=None):
+        """
+        Registers func() as the live value of `name`; kind="counter" for monotonic values kept elsewhere.
+        With `label`, func() returns {label_value: value} and each entry becomes its own series.
+        """
+        self._meta[name] = (kind, help_text)
+        self._gauges[name] = (func, label)
+
+    def inc(self, name, amount=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def observe(self, name, value, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        buckets = self._bucket_overrides.get(name, self.buckets)
+        with self._lock:
+            series = self._histograms.get(key)
+            if series is None:
+                series = self._histograms[key] = [0] * (len(buckets) + 2)
+            for i, bound in enumerate(buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += 1
+            series[-1] += value
+
+    @contextmanager
+    def timer(self, name, **labels):
+        """
+        Observes the wall time of the block into histogram `name`, whether it raises or not.
+        """
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.observe(name, time.monotonic() - start, **labels)
+
+    def render(self):
+        with self._lock:
+            counters = dict(self._counters)
+            histograms = {key: list(series) for key, series in self._histograms.items()}
+
+        lines = []
+        for name, (kind, help_text) in list(self._meta.items()):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            if name in self._gauges:
+                func, label = self._gauges[name]
+                try:
+                    value = func()
+                except Exception as e:
+                    logger.debug("Metric %s unavailable - %s", name, e)
+                    continue
+                if label is not None:
+                    for label_value, series_value in sorted(value.items()):
+                        lines.append(f"{name}{_format_labels(((label, label_value),))} {_format_metric_value(series_value)}")
+                elif value is not None:
+                    lines.append(f"{name} {_format_metric_value(value)}")
+            elif kind == "counter":
+                for (series_name, labels), value in sorted(counters.items()):
+                    if series_name == name:
+                        lines.append(f"{name}{_format_labels(labels)} {_format_metric_value(value)}")
+            else:
+                for (series_name, labels), series in sorted(histograms.items()):
+                    if series_name != name:
+                        continue
+                    for bound, count in zip(self._bucket_overrides.get(name, self.buckets), series):
+                        lines.append(f"{name}_bucket{_format_labels(labels + (('le', bound),))} {count}")
+                    lines.append(f"{name}_bucket{_format_labels(labels + (('le', '+Inf'),))} {series[-2]}")
+                    lines.append(f"{name}_sum{_format_labels(labels)} {_format_metric_value(series[-1])}")
+                    lines.append(f"{name}_count{_format_labels(labels)} {series[-2]}")
+        return "\n".join(lines) + "\n"
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in labels)
+    return "{" + ",".join(f'{key}="{value}"' for (key, _), value in zip(labels, escaped)) + "}"
+
+
+def _format_metric_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(int(value))
+
+
+metrics = Metrics()
+metrics.histogram("dexscreener_request_duration_seconds", "DexScreener request latency per attempt, by endpoint family.")
+metrics.counter("dexscreener_requests_total", "DexScreener request attempts by endpoint family and outcome.")
+metrics.counter("dexscreener_retries_total", "DexScreener attempts retried after a failure or 429, by endpoint family.")
+metrics.counter("dexscreener_failures_total", "DexScreener requests that failed after every retry, by endpoint family.")
+metrics.histogram("db_statement_duration_seconds", "Database statement latency, including commit, by statement.")
+metrics.histogram("scan_loop_iteration_seconds", "Time spent polling and inspecting one batch of latest profiles.")
+metrics.histogram("pair_resolution_latency_seconds", "Time from DEX-paid detection to resolved pairs.",
+                  buckets=(0.5, 1, 2, 3, 5, 10, 15, 30, 60))
+metrics.histogram("replay_detection_latency_seconds", "Replayed time from a token's first feed listing to its DEX-paid detection.",
+                  buckets=REPLAY_DETECTION_BUCKETS)
+
+
+class MetricsRequestHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?", 1)[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = metrics.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.debug("Metrics scrape: " + format, *args)
+
+
+def start_metrics_server(port=METRICS_PORT, host=METRICS_HOST):
+    """
+    Serves GET /metrics for Prometheus from a daemon thread. Returns the server.
+    """
+    server = ThreadingHTTPServer((host, port), MetricsRequestHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    logger.info("📊 Metrics available at http://%s:%d/metrics", host, server.server_address[1])
+    return server
+
+
+class DatabasePool:
+    """
+    Threaded PostgreSQL connection pool shared by every DB function.
+    Callers wait for a free connection instead of failing when the pool is exhausted. Returned connections
+    stay open on an idle list (up to maxconn, so every concurrent user keeps its own warm connection),
+    idle connections are health-checked before reuse, and broken ones are dropped so the pool reconnects.
+    """
+
+    def __init__(self, maxconn=DB_POOL_MAX_SIZE, healthcheck_idle=DB_POOL_HEALTHCHECK_IDLE):
+        self.maxconn = maxconn
+        self.healthcheck_idle = healthcheck_idle
+        self._idle = []  # Most recently returned last, so the warmest connection is reused first
+        self._idle_lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(maxconn)
+        self._last_used = {}
+        self._stats_lock = threading.Lock()
+        self.checkouts = 0
+        self.connects = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.reconnects = 0
+
+    def _connect(self):
+        # Opened on demand, so a database outage at startup is retried on the next checkout
+        options = f"-c search_path={DB_SCHEMA}" if DB_SCHEMA else None
+        conn = psycopg2.connect(dbname=DB_NAME, user=DB_USER, password=DB_PASSWORD, host=DB_HOST, port=DB_PORT,
+                                options=options)
+        with self._stats_lock:
+            self.connects += 1
+        return conn
+
+    def _is_healthy(self, conn):
+        if conn.closed:
+            return False
+        last_used = self._last_used.get(conn)
+        if last_used is not None and time.monotonic() - last_used < self.healthcheck_idle:
+            return True
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+    def _checkout(self):
+        # After a Postgres restart every idle connection is dead: keep dropping them until one answers,
+        # then fall back to a fresh connection
+        while True:
+            with self._idle_lock:
+                if not self._idle:
+                    return self._connect()
+                conn = self._idle.pop()
+            if self._is_healthy(conn):
+                return conn
+            logger.warning("⚠️ Dropping broken database connection, reconnecting...")
+            self._discard(conn)
+            with self._stats_lock:
+                self.reconnects += 1
+
+    def _discard(self, conn):
+        self._last_used.pop(conn, None)
+        try:
+            conn.close()
+        except psycopg2.Error:
+            pass
+
+    def _release(self, conn, broken):
+        if not broken and not conn.closed and conn.info.transaction_status != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+            try:
+                conn.rollback()  # Never hand out a connection with someone else's open transaction
+            except psycopg2.Error:
+                broken = True
+        if broken or conn.closed:
+            self._discard(conn)
+            return
+        self._last_used[conn] = time.monotonic()
+        with self._idle_lock:
+            self._idle.append(conn)
+
+    @contextmanager
+    def connection(self):
+        """
+        Yields a pooled connection. Commit inside the block; open transactions are rolled back on return.
+        """
+        start = time.monotonic()
+        self._slots.acquire()
+        waited = time.monotonic() - start
+        with self._stats_lock:
+            self.checkouts += 1
+            self.wait_total += waited
+            self.wait_max = max(self.wait_max, waited)
+
+        try:
+            conn = self._checkout()
+        except Exception:
+            self._slots.release()
+            raise
+
+        broken = False
+        try:
+            yield conn
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            broken = True
+            raise
+        finally:
+            self._release(conn, broken)
+            self._slots.release()
+
+    def stats(self):
+        with self._idle_lock:
+            idle = len(self._idle)
+        with self._stats_lock:
+            return {
+                "checkouts": self.checkouts,
+                "connects": self.connects,
+                "idle": idle,
+                "wait_avg_seconds": self.wait_total / self.checkouts if self.checkouts else 0.0,
+                "wait_max_seconds": self.wait_max,
+                "reconnects": self.reconnects,
+                "max_size": self.maxconn,
+            }
+
+    def close(self):
+        with self._idle_lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            self._discard(conn)
+
+db_pool = DatabasePool()
+
 
 def init_db():
-    conn = psycopg2.connect(
-        dbname=DB_NAME, user=DB_USER, password=DB_PASSWORD, host=DB_HOST, port=DB_PORT
-    )
-    cursor = conn.cursor()
+    with db_pool.connection() as conn, conn.cursor() as cursor:
+        if DB_SCHEMA:
+            cursor.execute(f'CREATE SCHEMA IF NOT EXISTS "{DB_SCHEMA}"')
+
+        # Create the tokens table with ATH tracking
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS tokens (
+                id SERIAL PRIMARY KEY,
+                token_name TEXT,
+                symbol TEXT,
+                contract_address TEXT UNIQUE,
+                market_cap_at_dex_paid INTEGER,
+                highest_market_cap INTEGER,
+                pair_created_at TIMESTAMP,
+                dex_paid_at TIMESTAMP,
+                ath_timestamp TIMESTAMP,
+                logged_at TIMESTAMP DEFAULT NOW()
+            )
+        """)
+
+        # Older databases were created without contract_address; add it and its unique index
+        cursor.execute("ALTER TABLE tokens ADD COLUMN IF NOT EXISTS contract_address TEXT")
+        cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS tokens_contract_address_key ON tokens (contract_address)")
+
+        # Create the price tracking table
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS prices (
+                id SERIAL PRIMARY KEY,
+                token_name TEXT,
+                token_address TEXT,
+                timestamp TIMESTAMP,
+                price_usd REAL
+            )
+        """)
+
+        if PRICE_STORAGE_MODE == "partitioned":
+            init_price_partitions(cursor)
+
+        # Sharded tracking: live workers and which of them tracks each active token
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS tracking_workers (
+                worker_id TEXT PRIMARY KEY,
+                started_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+                heartbeat_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+            )
+        """)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS tracking_leases (
+                contract_address TEXT PRIMARY KEY,
+                worker_id TEXT,
+                lease_expires_at TIMESTAMPTZ
+            )
+        """)
+        cursor.execute("CREATE INDEX IF NOT EXISTS tracking_leases_worker_idx ON tracking_leases (worker_id)")
+
+        conn.commit()
 
-    # Create the tokens table with ATH tracking
+
+def init_price_partitions(cursor):
+    """
+    Creates the time-partitioned price_ticks table: token id instead of repeated name/address text,
+    NUMERIC prices with NULL when unknown, a (token_id, timestamp) index for per-token history
+    and a BRIN index for time-range scans.
+    """
     cursor.execute("""
-        CREATE TABLE IF NOT EXISTS tokens (
-            id SERIAL PRIMARY KEY,
-            token_name TEXT,
-            symbol TEXT,
-            market_cap_at_dex_paid INTEGER,
-            highest_market_cap INTEGER,
-            pair_created_at TIMESTAMP,
-            dex_paid_at TIMESTAMP,
-            ath_timestamp TIMESTAMP,
-            logged_at TIMESTAMP DEFAULT NOW()
-        )
+        CREATE TABLE IF NOT EXISTS price_ticks (
+            token_id INTEGER NOT NULL REFERENCES tokens (id),
+            timestamp TIMESTAMPTZ NOT NULL,
+            price_usd NUMERIC
+        ) PARTITION BY RANGE (timestamp)
     """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS price_ticks_token_time_idx ON price_ticks (token_id, timestamp)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS price_ticks_time_brin ON price_ticks USING BRIN (timestamp)")
+
+    # Catches ticks outside the pre-created days instead of failing the whole batch
+    cursor.execute("CREATE TABLE IF NOT EXISTS price_ticks_default PARTITION OF price_ticks DEFAULT")
 
-    # Create the price tracking table
+    ensure_price_partitions(cursor)
+
+
+def ensure_price_partitions(cursor, days_ahead=PRICE_PARTITIONS_AHEAD):
+    """
+    Creates one daily price_ticks partition for yesterday through `days_ahead` days from now (UTC).
+    """
+    today = datetime.now(timezone.utc).date()
+    for offset in range(-1, days_ahead + 1):
+        day = today + timedelta(days=offset)
+        cursor.execute(f"""
+            CREATE TABLE IF NOT EXISTS price_ticks_p{day:%Y%m%d} PARTITION OF price_ticks
+            FOR VALUES FROM ('{day} 00:00:00+00') TO ('{day + timedelta(days=1)} 00:00:00+00')
+        """)
+
+
+def drop_expired_price_partitions(cursor, retention_days=PRICE_RETENTION_DAYS):
+    """
+    Drops daily price_ticks partitions whose whole day is older than the retention window.
+    """
+    if retention_days is None:
+        return []
+
+    cutoff = datetime.now(timezone.utc).date() - timedelta(days=retention_days)
     cursor.execute("""
-        CREATE TABLE IF NOT EXISTS prices (
-            id SERIAL PRIMARY KEY,
-            token_name TEXT,
-            token_address TEXT,
-            timestamp TIMESTAMP,
-            price_usd REAL
-        )
+        SELECT child.relname
+        FROM pg_inherits
+        JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+        JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+        WHERE parent.relname = 'price_ticks'
     """)
 
-    conn.commit()
-    conn.close()
-init_db()
+    dropped = []
+    for (partition,) in cursor.fetchall():
+        if not partition.startswith("price_ticks_p"):
+            continue  # Default partition
+        day = datetime.strptime(partition[len("price_ticks_p"):], "%Y%m%d").date()
+        if day + timedelta(days=1) <= cutoff:
+            cursor.execute(f"DROP TABLE IF EXISTS {partition}")
+            dropped.append(partition)
+    return dropped
 
 
-def retry_request(url, max_retries=3, delay=2):
+def maintain_price_partitions():
     """
-    Handles retries for API requests in case of temporary failures.
+    Periodic job: pre-creates upcoming partitions and applies the retention policy.
     """
+    try:
+        with db_pool.connection() as conn, conn.cursor() as cursor:
+            ensure_price_partitions(cursor)
+            dropped = drop_expired_price_partitions(cursor)
+            conn.commit()
+        if dropped:
+            logger.info("🧹 Dropped expired price partitions: %s", ", ".join(dropped))
+    except Exception as e:
+        logger.error("❌ Price partition maintenance failed - %s", e)
+
+
+class HTTPClient:
+    """
+    Shared, thread-safe HTTP client with keep-alive connection pooling.
+    Every DexScreener call goes through one session, so TCP+TLS handshakes are reused.
+    """
+
+    def __init__(self, pool_connections=HTTP_POOL_CONNECTIONS, pool_maxsize=HTTP_POOL_MAXSIZE, pool_block=HTTP_POOL_BLOCK):
+        self.session = requests.Session()
+        self.adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, pool_block=pool_block)
+        self.session.mount("https://", self.adapter)
+        self.session.mount("http://", self.adapter)
+
+    def get(self, url, timeout=5):
+        return self.session.get(url, timeout=timeout)
+
+    def pool_stats(self):
+        """
+        Returns pool hits (requests served on a reused connection) and misses (new connections opened).
+        """
+        requests_made = 0
+        connections_opened = 0
+        pools = self.adapter.poolmanager.pools
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            requests_made += pool.num_requests
+            connections_opened += pool.num_connections
+
+        return {
+            "host_pools": len(pools),
+            "requests": requests_made,
+            "hits": requests_made - connections_opened,
+            "misses": connections_opened,
+        }
+
+    def close(self):
+        self.session.close()
+
+http_client = HTTPClient()
+replay_client = None  # Set when running from a recording (--replay)
+timer_speed = 1.0  # Detection-path waits run this many times faster, set by an accelerated replay
+
+
+def endpoint_family(url):
+    """
+    Maps a DexScreener URL to its rate-limit family, e.g. "token-profiles", "orders" or "token-pairs".
+    """
+    if url.startswith(DEXSCREENER_API_BASE_URL):
+        path = url[len(DEXSCREENER_API_BASE_URL):]
+    else:
+        path = urlsplit(url).path
+    return path.lstrip("/").split("/", 1)[0]
+
+
+def parse_retry_after(response, default):
+    try:
+        return max(0.0, float(response.headers.get("Retry-After", default)))
+    except (TypeError, ValueError):
+        return default  # HTTP-date form; fall back to the normal delay
+
+
+class RateLimiter:
+    """
+    Process-wide token buckets, one per DexScreener endpoint family.
+    Callers take a token per request; a lane may not take one while a higher-priority caller is waiting
+    on the same family, or when that would drain the bucket below the lane's RATE_LIMIT_LANE_RESERVE.
+    A 429 blocks the whole family until its Retry-After expires.
+    """
+
+    def __init__(self, limits=RATE_LIMITS, default_limit=RATE_LIMIT_DEFAULT,
+                 burst_seconds=RATE_LIMIT_BURST_SECONDS, lane_reserve=RATE_LIMIT_LANE_RESERVE):
+        self.limits = limits
+        self.default_limit = default_limit
+        self.burst_seconds = burst_seconds
+        self.lane_reserve = lane_reserve
+        self._cond = threading.Condition()
+        self._buckets = {}  # family -> [tokens, last_refill, rate_per_second, capacity]
+        self._blocked_until = {}
+        self._waiting = {}  # family -> {priority: waiting callers}
+        self.waits = 0
+        self.wait_total = 0.0
+        self.penalties = 0
+
+    def _refill(self, family, now):
+        bucket = self._buckets.get(family)
+        if bucket is None:
+            rate = self.limits.get(family, self.default_limit) / 60.0
+            capacity = max(1.0, rate * self.burst_seconds)
+            bucket = self._buckets[family] = [capacity, now, rate, capacity]
+        else:
+            bucket[0] = min(bucket[3], bucket[0] + (now - bucket[1]) * bucket[2])
+            bucket[1] = now
+        return bucket
+
+    def acquire(self, family, priority=PRIORITY_DETECTION):
+        """
+        Blocks until this lane may send one request to `family`; returns the seconds waited.
+        """
+        start = time.monotonic()
+        with self._cond:
+            waiting = self._waiting.setdefault(family, {})
+            waiting[priority] = waiting.get(priority, 0) + 1
+            try:
+                while True:
+                    now = time.monotonic()
+                    bucket = self._refill(family, now)
+                    blocked = self._blocked_until.get(family, 0.0) - now
+                    higher_waiting = any(count for lane, count in waiting.items() if lane < priority)
+                    # Capped so a lane can still take the last token of a one-token bucket (limits of a few per minute)
+                    floor = min(self.lane_reserve.get(priority, 0.0) * bucket[3], bucket[3] - 1)
+
+                    if blocked <= 0 and not higher_waiting and bucket[0] >= floor + 1:
+                        bucket[0] -= 1
+                        break
+
+                    if blocked > 0:
+                        timeout = blocked
+                    else:
+                        timeout = max(floor + 1 - bucket[0], 1.0) / bucket[2]
+                    self._cond.wait(timeout)
+            finally:
+                waiting[priority] -= 1
+                self._cond.notify_all()
+
+        waited = time.monotonic() - start
+        if waited > 0.001:
+            with self._cond:
+                self.waits += 1
+                self.wait_total += waited
+        return waited
+
+    def penalize(self, family, retry_after):
+        """
+        Honours a Retry-After: nobody sends to this family until it expires, and the bucket restarts empty.
+        """
+        with self._cond:
+            now = time.monotonic()
+            self._blocked_until[family] = max(self._blocked_until.get(family, 0.0), now + retry_after)
+            self._refill(family, now)[0] = 0.0
+            self.penalties += 1
+            self._cond.notify_all()
+
+    def blocked_for(self, family):
+        """
+        Seconds until a Retry-After received for this endpoint family expires.
+        """
+        with self._cond:
+            return max(0.0, self._blocked_until.get(family, 0.0) - time.monotonic())
+
+    def stats(self):
+        with self._cond:
+            now = time.monotonic()
+            return {
+                "available": {family: round(self._refill(family, now)[0], 2) for family in self._buckets},
+                "waits": self.waits,
+                "wait_total_seconds": self.wait_total,
+                "penalties": self.penalties,
+            }
+
+rate_limiter = RateLimiter()
+
+
+def retry_request(url, max_retries=3, delay=2, priority=PRIORITY_DETECTION, decode=None):
+    """
+    Handles retries for API requests in case of temporary failures. Waits are divided by timer_speed.
+    Every attempt takes a token from the shared rate limiter in the caller's priority lane.
+    `decode` turns the raw body into the result (default: response.json()); a ValueError from it counts as a failed attempt.
+    """
+    family = endpoint_family(url)
     for attempt in range(max_retries):
+        if attempt:
+            metrics.inc("dexscreener_retries_total", endpoint=family)
+        rate_limiter.acquire(family, priority)
+        start = time.monotonic()
         try:
-            response = requests.get(url, timeout=5)
+            response = http_client.get(url, timeout=5)
+            metrics.observe("dexscreener_request_duration_seconds", time.monotonic() - start, endpoint=family)
+            metrics.inc("dexscreener_requests_total", endpoint=family, status=str(response.status_code))
             if response.status_code == 200:
-                return response.json()
+                return decode(response.content) if decode else response.json()
+            elif response.status_code == 429:
+                retry_after = parse_retry_after(response, delay) / timer_speed
+                rate_limiter.penalize(family, retry_after)
+                logger.warning("⚠️ Rate limited on %s, backing off %.1fs", family, retry_after)
+                continue  # The next acquire() waits out the Retry-After
             else:
-                print(f"⚠️ API Error {response.status_code}: {response.text}")
+                logger.warning("⚠️ API Error %s: %s", response.status_code, response.text)
         except requests.exceptions.RequestException as e:
-            print(f"⚠️ Request failed (Attempt {attempt+1}/{max_retries}): {e}")
-        time.sleep(delay)
+            metrics.observe("dexscreener_request_duration_seconds", time.monotonic() - start, endpoint=family)
+            metrics.inc("dexscreener_requests_total", endpoint=family, status="error")
+            logger.warning("⚠️ Request failed (Attempt %d/%d): %s", attempt + 1, max_retries, e)
+        except ValueError as e:
+            logger.warning("⚠️ Malformed response from %s (Attempt %d/%d): %s", family, attempt + 1, max_retries, e)
+        time.sleep(delay / timer_speed)
+    metrics.inc("dexscreener_failures_total", endpoint=family)
     return None  # Return None if all retries fail
 
 
+@dataclass(frozen=True, slots=True)
+class PairSnapshot:
+    """
+    The fields the bot reads from one DexScreener pair; the rest of the payload is never materialised.
+    """
+    base_address: Optional[str]
+    name: Optional[str]
+    symbol: Optional[str]
+    market_cap: Optional[float]
+    price_usd: Optional[float]
+    pair_created_at: Optional[int]  # Epoch milliseconds
+
+    @classmethod
+    def from_dict(cls, item):
+        base_token = item.get("baseToken")
+        if not isinstance(base_token, dict):
+            base_token = {}
+        return cls(
+            base_token.get("address"),
+            base_token.get("name"),
+            base_token.get("symbol"),
+            _to_float(item.get("marketCap")),
+            _to_float(item.get("priceUsd")),
+            _to_int(item.get("pairCreatedAt")),
+        )
+
+
+def _to_float(value):
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _to_int(value):
+    try:
+        return int(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+if msgspec is not None:
+    class _WireToken(msgspec.Struct):
+        address: Optional[str] = None
+        name: Optional[str] = None
+        symbol: Optional[str] = None
+
+    class _WirePair(msgspec.Struct):
+        baseToken: Optional[_WireToken] = None
+        marketCap: Union[float, None, msgspec.UnsetType] = msgspec.UNSET  # UNSET = field absent, pair skipped
+        priceUsd: Optional[float] = None
+        pairCreatedAt: Optional[int] = None
+
+    # Unknown fields are skipped without being built; strict=False parses priceUsd strings to floats
+    _pairs_decoder = msgspec.json.Decoder(list[_WirePair], strict=False) if FAST_JSON_DECODE else None
+else:
+    _pairs_decoder = None
+
+
+def loads_json(content):
+    """
+    Parses a JSON body with orjson when available. Raises ValueError on invalid JSON.
+    """
+    if FAST_JSON_DECODE and orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+def project_pairs(data):
+    """
+    Keeps the pairs that carry a marketCap, as PairSnapshots. Tolerates any payload shape.
+    """
+    if not isinstance(data, list):
+        return []
+    return [PairSnapshot.from_dict(item) for item in data if isinstance(item, dict) and "marketCap" in item]
+
+
+def decode_pairs(content):
+    """
+    Decodes a token-pairs/v1 or tokens/v1 body straight to PairSnapshots.
+    Uses the typed msgspec decoder when installed; payloads it rejects (valid JSON, unexpected types)
+    and installs without it take the generic parse + projection path.
+    """
+    if _pairs_decoder is not None:
+        try:
+            wire_pairs = _pairs_decoder.decode(content)
+        except msgspec.ValidationError:
+            pass
+        except msgspec.DecodeError as e:
+            raise ValueError(f"Invalid JSON: {e}") from e
+        else:
+            snapshots = []
+            for pair in wire_pairs:
+                if pair.marketCap is msgspec.UNSET:
+                    continue
+                base_token = pair.baseToken or _WireToken()
+                snapshots.append(PairSnapshot(base_token.address, base_token.name, base_token.symbol,
+                                              pair.marketCap, pair.priceUsd, pair.pairCreatedAt))
+            return snapshots
+    return project_pairs(loads_json(content))
+
+
+@dataclass(frozen=True, slots=True)
+class ProfileSnapshot:
+    """
+    One token-profiles/latest entry: what the scan needs plus a fingerprint of the fields FeedDiffer watches.
+    """
+    chain_id: Optional[str]
+    token_address: Optional[str]
+    fingerprint: int
+
+    @classmethod
+    def from_dict(cls, item, fields=FEED_FINGERPRINT_FIELDS):
+        return cls(item.get("chainId"), item.get("tokenAddress"), hash(repr(tuple(item.get(field) for field in fields))))
+
+
+@dataclass(frozen=True, slots=True)
+class OrderSnapshot:
+    """
+    One orders/v1 entry.
+    """
+    type: Optional[str]
+    status: Optional[str]
+    payment_timestamp: Optional[int]  # Epoch milliseconds
+
+    @classmethod
+    def from_dict(cls, item):
+        return cls(item.get("type"), item.get("status"), _to_int(item.get("paymentTimestamp")))
+
+
+@dataclass(frozen=True, slots=True)
+class TokenSnapshot:
+    """
+    A DEX paid token as saved to the tokens table. Timestamps stay epoch milliseconds until Postgres converts them.
+    """
+    contract_address: Optional[str]
+    token_name: Optional[str]
+    symbol: Optional[str]
+    market_cap: Optional[float]
+    pair_created_at: Optional[int]
+    dex_paid_at: Optional[int]
+
+    @classmethod
+    def from_pair(cls, pair, order=None):
+        """
+        Builds the row for a paid token from its first PairSnapshot and the OrderSnapshot that showed it paid.
+        """
+        return cls(
+            contract_address=pair.base_address,
+            token_name=pair.name,
+            symbol=pair.symbol,
+            market_cap=pair.market_cap,
+            pair_created_at=pair.pair_created_at,
+            dex_paid_at=order.payment_timestamp if order else None,
+        )
+
+
+def decode_profiles(content):
+    """
+    Decodes a token-profiles/latest body to ProfileSnapshots, skipping entries that aren't objects.
+    """
+    data = loads_json(content)
+    if not isinstance(data, list):
+        return []
+    return [ProfileSnapshot.from_dict(item) for item in data if isinstance(item, dict)]
+
+
+def decode_orders(content):
+    """
+    Decodes an orders/v1 body to OrderSnapshots, skipping entries that aren't objects.
+    """
+    data = loads_json(content)
+    if not isinstance(data, list):
+        return []
+    return [OrderSnapshot.from_dict(item) for item in data if isinstance(item, dict)]
+
+
 # Function to get latest token profiles
 def get_latest_token_profiles():
     url = f"{DEXSCREENER_API_BASE_URL}/token-profiles/latest/v1"
-    return retry_request(url)
+    return retry_request(url, decode=decode_profiles)
 
 def is_dex_paid(chain_id, token_address):
     url = f"{DEXSCREENER_API_BASE_URL}/orders/v1/{chain_id}/{token_address}"
-    orders = retry_request(url)
+    orders = retry_request(url, decode=decode_orders)
 
-    if not orders or not isinstance(orders, list):  # ✅ Ensures it's a list
+    if not orders:
         return False, None
 
     for order in orders:
-        if isinstance(order, dict):  # ✅ Ensures each order is a dictionary
-            if order.get("type") == "tokenProfile" and order.get("status") == "approved":
-                return True, order
+        if order.type == "tokenProfile" and order.status == "approved":
+            return True, order
 
     return False, None
 
-def get_token_pairs(chain_id, token_address):
+class NotPaidCache:
     """
-    Fetches available trading pairs for a given token on a specific blockchain.
+    Negative-result cache for tokens whose orders/v1 check came back not paid.
+    Each miss pushes the next recheck further out (NOT_PAID_RECHECK_DELAYS, capped at
+    NOT_PAID_MAX_RECHECK_DELAY), and tokens that stop showing up expire after NOT_PAID_CACHE_TTL.
+    """
+
+    def __init__(self, delays=NOT_PAID_RECHECK_DELAYS, max_delay=NOT_PAID_MAX_RECHECK_DELAY,
+                 ttl=NOT_PAID_CACHE_TTL, maxsize=NOT_PAID_CACHE_MAXSIZE):
+        self.delays = delays
+        self.max_delay = max_delay
+        self._entries = TTLCache(maxsize=maxsize, ttl=ttl)  # address -> (next_check_at, misses)
+        self._lock = threading.Lock()
+        self.skipped = 0
+
+    def should_check(self, token_address):
+        with self._lock:
+            entry = self._entries.get(token_address)
+            if entry is None or time.monotonic() >= entry[0]:
+                return True
+            self.skipped += 1
+            return False
+
+    def record_not_paid(self, token_address):
+        with self._lock:
+            entry = self._entries.get(token_address)
+            misses = entry[1] + 1 if entry else 1
+            delay = min(self.delays[min(misses, len(self.delays)) - 1], self.max_delay)
+            self._entries[token_address] = (time.monotonic() + delay, misses)
+
+    def forget(self, token_address):
+        with self._lock:
+            self._entries.pop(token_address, None)
+
+    def stats(self):
+        with self._lock:
+            return {"tracked": len(self._entries), "skipped_checks": self.skipped}
+
+not_paid_cache = NotPaidCache()
+
+
+def get_token_pairs(chain_id, token_address, priority=PRIORITY_DETECTION):
+    """
+    Fetches available trading pairs for a given token on a specific blockchain, as PairSnapshots.
     """
     url = f"{DEXSCREENER_API_BASE_URL}/token-pairs/v1/{chain_id}/{token_address}"
-    data = retry_request(url)
+    pairs = retry_request(url, priority=priority, decode=decode_pairs)
 
-    if not data:
-        print(f"❌ No data received for {token_address}")
+    if pairs is None:
+        logger.warning("❌ No data received for %s", token_address)
         return []
 
-    # ✅ Fix: API returns a list, so we extract pairs from each item
-    pairs = []
-    if isinstance(data, list):
-        for item in data:
-            if isinstance(item, dict) and "marketCap" in item:  # Ensure it's a valid dictionary with marketCap
-                pairs.append(item)
-
     if pairs:
-        print(f"✅ Found ")
+        logger.debug("✅ Found %d pairs for %s", len(pairs), token_address)
         return pairs
 
-    print(f"⚠️ No pairs found for {token_address} (API returned empty or unexpected format)")
+    logger.info("⚠️ No pairs found for %s (API returned empty or unexpected format)", token_address)
     return []
 
 
-def save_token_data(token_data):
-    print(f" DEBUG: Attempting to save token: {token_data}")
+def get_tokens_pairs_batch(chain_id, token_addresses, priority=PRIORITY_BACKGROUND):
+    """
+    Fetches pairs for many tokens using the multi-address tokens endpoint.
+    Addresses are chunked to TOKENS_BATCH_SIZE, so N tokens cost N/30 requests.
+    Returns {token_address: [PairSnapshot...]} keyed by base token address; tokens with no pairs are omitted.
+    """
+    pairs_by_address = {}
+    token_addresses = list(token_addresses)
+
+    for start in range(0, len(token_addresses), TOKENS_BATCH_SIZE):
+        chunk = token_addresses[start:start + TOKENS_BATCH_SIZE]
+        url = f"{DEXSCREENER_API_BASE_URL}/tokens/v1/{chain_id}/{','.join(chunk)}"
+        pairs = retry_request(url, priority=priority, decode=decode_pairs)
+
+        if not pairs:
+            logger.warning("⚠️ No batch data received for %d tokens", len(chunk))
+            continue
+
+        requested = set(chunk)
+        for pair in pairs:
+            # Pairs where our token is only the quote side don't carry its market cap
+            if pair.base_address in requested:
+                pairs_by_address.setdefault(pair.base_address, []).append(pair)
+
+    return pairs_by_address
+
+
+def save_token_data(token):
+    logger.debug("Attempting to save token: %s", token)
+
+    market_cap = token.market_cap
+    if not isinstance(market_cap, (int, float)):  # Ensure it's a valid number
+        market_cap = 0
 
     try:
-        conn = psycopg2.connect(
-            dbname=DB_NAME, user=DB_USER, password=DB_PASSWORD, host=DB_HOST, port=DB_PORT
-        )
-        cursor = conn.cursor()
+        with db_pool.connection() as conn, conn.cursor() as cursor, metrics.timer("db_statement_duration_seconds", statement="upsert_token"):
+            # One statement: insert new tokens, or raise highest_market_cap on existing ones.
+            # ✅ `market_cap_at_dex_paid` is never touched after insertion.
+            cursor.execute("""
+                INSERT INTO tokens (token_name, symbol, contract_address, market_cap_at_dex_paid, highest_market_cap, pair_created_at, dex_paid_at, ath_timestamp)
+                VALUES (%s, %s, %s, %s, %s,
+                        to_timestamp(%s / 1000.0) AT TIME ZONE 'UTC',
+                        to_timestamp(%s / 1000.0) AT TIME ZONE 'UTC',
+                        NOW() AT TIME ZONE 'UTC')
+                ON CONFLICT (contract_address) DO UPDATE
+                SET highest_market_cap = GREATEST(tokens.highest_market_cap, EXCLUDED.highest_market_cap),
+                    ath_timestamp = EXCLUDED.ath_timestamp
+                WHERE tokens.highest_market_cap IS NULL OR EXCLUDED.highest_market_cap > tokens.highest_market_cap
+                RETURNING (xmax = 0) AS inserted
+            """, (
+                token.token_name,
+                token.symbol,
+                token.contract_address,
+                market_cap,  # ✅ Market Cap at DEX Paid time is stored permanently
+                market_cap,  # ✅ Start `highest_market_cap` at `market_cap` initially
+                token.pair_created_at,  # Epoch ms; NULL stays NULL
+                token.dex_paid_at,
+            ))
+            result = cursor.fetchone()
+            conn.commit()
 
-        # Debugging: Check if DB connection works
-        print(" Connected to the database")
+        if result is None:
+            logger.debug("Skipping %s - No new highest market cap.", token.token_name)
+        elif result[0]:
+            logger.info("✅ Successfully saved %s to the database.", token.token_name)
+        else:
+            logger.info("✅ ATH Updated for %s: %s", token.token_name, market_cap)
 
-        # Check if the token exists in DB
-        cursor.execute("SELECT market_cap_at_dex_paid, highest_market_cap, ath_timestamp FROM tokens WHERE contract_address = %s", 
-                       (token_data.get("contractAddress"),))
-        existing_token = cursor.fetchone()
+    except Exception as e:
+        logger.error("❌ Failed to save token to DB - %s", e)
 
-        market_cap = token_data.get("marketCap", 0)
-        if not isinstance(market_cap, (int, float)):  # Ensure it's a valid number
-            market_cap = 0
 
-        if existing_token:
-            # Extract existing data
-            market_cap_at_dex_paid, highest_market_cap, existing_ath_timestamp = existing_token
+class TrackingJob:
+    __slots__ = ("job_id", "func", "args", "interval", "remaining", "due")
 
-            # ✅ Ensure `market_cap_at_dex_paid` is NEVER updated after insertion.
-            if market_cap > highest_market_cap:
-                new_ath_time = datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S UTC')
-                print(f"📈 Updating {token_data.get('tokenName')} - New ATH: {market_cap} at {new_ath_time}")
+    def __init__(self, job_id, func, args, interval, remaining, due):
+        self.job_id = job_id
+        self.func = func
+        self.args = args
+        self.interval = interval
+        self.remaining = remaining  # None = run until cancelled
+        self.due = due
 
-                cursor.execute("""
-                    UPDATE tokens 
-                    SET highest_market_cap = %s, ath_timestamp = %s 
-                    WHERE contract_address = %s
-                """, (market_cap, new_ath_time, token_data.get("contractAddress")))
 
+class TrackingScheduler:
+    """
+    Owns every active tracking job in one timer heap.
+    A single dispatcher thread sleeps until the next tick is due and hands it to a small worker pool,
+    instead of keeping one mostly idle thread per tracked token.
+    """
+
+    def __init__(self, max_workers=TRACKING_WORKERS):
+        self._heap = []  # (due, seq, job)
+        self._jobs = {}
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="tracking")
+        self._dispatcher = None
+        self._submitted = {}  # seq -> due, for ticks waiting in the executor queue, oldest first
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+
+    def schedule(self, job_id, func, args=(), interval=60, runs=None, delay=0):
+        """
+        Runs func(*args) every `interval` seconds, `runs` times (forever if None), first tick after `delay`.
+        Returns False if a job with the same id is already active.
+        """
+        with self._cond:
+            if job_id in self._jobs:
+                return False
+            job = TrackingJob(job_id, func, args, interval, runs, time.monotonic() + delay)
+            self._jobs[job_id] = job
+            self._push(job)
+            self._ensure_started()
+            return True
+
+    def cancel(self, job_id):
+        with self._cond:
+            return self._jobs.pop(job_id, None) is not None
+
+    def job_count(self):
+        with self._cond:
+            return len(self._jobs)
+
+    def lag(self):
+        """
+        How far behind schedule the most overdue tick that hasn't started yet is, in seconds: either
+        still in the heap or already handed to the worker pool and waiting for a free thread.
+        """
+        with self._cond:
+            oldest = [due for due in (self._heap[0][0] if self._heap else None,
+                                      next(iter(self._submitted.values()), None)) if due is not None]
+            if not oldest:
+                return 0.0
+            return max(0.0, time.monotonic() - min(oldest))
+
+    def stats(self):
+        return {
+            "jobs": self.job_count(),
+            "lag_seconds": self.lag(),
+            "last_start_lag_seconds": self.last_lag,
+            "max_start_lag_seconds": self.max_lag,
+        }
+
+    def _push(self, job):
+        heapq.heappush(self._heap, (job.due, next(self._seq), job))
+        self._cond.notify()
+
+    def _ensure_started(self):
+        if self._dispatcher is None:
+            self._dispatcher = threading.Thread(target=self._dispatch_loop, name="tracking-scheduler", daemon=True)
+            self._dispatcher.start()
+
+    def _dispatch_loop(self):
+        while True:
+            with self._cond:
+                while not self._heap:
+                    self._cond.wait()
+
+                due, _, job = self._heap[0]
+                now = time.monotonic()
+                if due > now:
+                    self._cond.wait(due - now)
+                    continue
+
+                heapq.heappop(self._heap)
+                if self._jobs.get(job.job_id) is not job:
+                    continue  # Cancelled
+                ticket = next(self._seq)
+                self._submitted[ticket] = due
+
+            try:
+                self._executor.submit(self._run_tick, job, ticket)
+            except RuntimeError:
+                return  # Interpreter shutting down
+
+    def _run_tick(self, job, ticket):
+        # Lag is measured when the tick starts, so time spent queued behind busy workers counts
+        with self._cond:
+            due = self._submitted.pop(ticket, job.due)
+            self.last_lag = max(0.0, time.monotonic() - due)
+            self.max_lag = max(self.max_lag, self.last_lag)
+
+        try:
+            job.func(*job.args)
+        except Exception as e:
+            logger.error("❌ Tracking job %s failed - %s", job.job_id, e)
+
+        with self._cond:
+            if self._jobs.get(job.job_id) is not job:
+                return
+            if job.remaining is not None:
+                job.remaining -= 1
+                if job.remaining <= 0:
+                    del self._jobs[job.job_id]
+                    return
+            # Fixed-rate: a slow tick shows up as lag instead of drifting the schedule
+            job.due += job.interval
+            self._push(job)
+
+tracking_scheduler = TrackingScheduler()
+
+
+class PriceBatchWriter:
+    """
+    Write-behind buffer for the prices table.
+    Ticks from every tracked token are queued and written by one thread with multi-row inserts,
+    flushing when PRICE_BATCH_MAX_ROWS is reached or the oldest tick is PRICE_BATCH_MAX_DELAY old.
+    """
+
+    def __init__(self, max_rows=PRICE_BATCH_MAX_ROWS, max_delay=PRICE_BATCH_MAX_DELAY, max_buffered=PRICE_BUFFER_MAX_ROWS):
+        self.max_rows = max_rows
+        self.max_delay = max_delay
+        self._queue = queue.Queue(maxsize=max_buffered)
+        self._stop = threading.Event()
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self.rows_written = 0
+        self.rows_dropped = 0
+        self.rows_failed = 0
+        self.rows_unmatched = 0
+        self.flushes = 0
+
+    def add(self, token_name, token_address, timestamp_ms, price_usd):
+        self._ensure_started()
+        try:
+            self._queue.put((token_name, token_address, timestamp_ms, price_usd), timeout=PRICE_BUFFER_PUT_TIMEOUT)
+        except queue.Full:
+            self.rows_dropped += 1
+            logger.warning("⚠️ Price buffer full, dropped tick for %s", token_name)
+
+    def close(self, timeout=10):
+        """
+        Flushes everything still buffered and stops the writer thread.
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def stats(self):
+        return {
+            "buffered": self._queue.qsize(),
+            "rows_written": self.rows_written,
+            "rows_dropped": self.rows_dropped,
+            "rows_failed": self.rows_failed,
+            "rows_unmatched": self.rows_unmatched,
+            "flushes": self.flushes,
+        }
+
+    def _ensure_started(self):
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="price-writer", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        batch = []
+        deadline = None
+        while not (self._stop.is_set() and self._queue.empty()):
+            wait = self.max_delay if not batch else max(0.0, deadline - time.monotonic())
+            try:
+                row = self._queue.get(timeout=min(wait, 0.5))
+            except queue.Empty:
+                row = None
+
+            if row is not None:
+                if not batch:
+                    deadline = time.monotonic() + self.max_delay
+                batch.append(row)
+                # Drain whatever else is already waiting without blocking
+                while len(batch) < self.max_rows:
+                    try:
+                        batch.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+
+            if batch and (len(batch) >= self.max_rows or time.monotonic() >= deadline):
+                self._flush(batch)
+                batch = []
+
+        if batch:
+            self._flush(batch)
+
+    def _flush(self, batch):
+        try:
+            with db_pool.connection() as conn, conn.cursor() as cursor, metrics.timer("db_statement_duration_seconds", statement="insert_price_ticks"):
+                if PRICE_STORAGE_MODE == "partitioned":
+                    # Resolve token ids in the same statement; ticks for unsaved tokens are skipped
+                    psycopg2.extras.execute_values(cursor, """
+                        INSERT INTO price_ticks (token_id, timestamp, price_usd)
+                        SELECT tokens.id, v.timestamp, v.price_usd
+                        FROM (VALUES %s) AS v (token_name, token_address, timestamp, price_usd)
+                        JOIN tokens ON tokens.contract_address = v.token_address
+                    """, batch, template="(%s, %s, to_timestamp(%s / 1000.0), %s::numeric)", page_size=len(batch))
+                    written = cursor.rowcount
+                else:
+                    psycopg2.extras.execute_values(cursor, """
+                        INSERT INTO prices (token_name, token_address, timestamp, price_usd)
+                        VALUES %s
+                    """, batch, template="(%s, %s, to_timestamp(%s / 1000.0) AT TIME ZONE 'UTC', %s)", page_size=len(batch))
+                    written = len(batch)
                 conn.commit()
-                print(f"✅ ATH Updated for {token_data.get('tokenName')}: {market_cap} at {new_ath_time}")
+            self.rows_written += written
+            self.rows_unmatched += len(batch) - written
+            self.flushes += 1
+        except Exception as e:
+            self.rows_failed += len(batch)
+            logger.error("❌ Failed to flush %d price ticks - %s", len(batch), e)
 
-            else:
-                print(f" Skipping {token_data.get('tokenName')} - No new highest market cap.")
+price_writer = PriceBatchWriter()
+atexit.register(price_writer.close)
+
+
+def record_price_tick(token_address, token_name):
+    """
+    Fetches the current price of a token and queues one row for the prices table.
+    """
+    pairs = get_token_pairs(TARGET_CHAIN_ID, token_address, priority=PRIORITY_TRACKING)
+    price_usd = pairs[0].price_usd if pairs else None  # NULL rather than a string in a REAL column
+
+    price_writer.add(token_name, token_address, time.time_ns() // 1_000_000, price_usd)
 
-            return  # Exit function if token already exists
+def track_price_changes(token_address, token_name, duration=PRICE_TRACK_HOURS, interval=PRICE_TRACK_INTERVAL_MINUTES, elapsed=0):
+    """
+    Registers price tracking for a token with the central scheduler.
+    One tick every `interval` minutes for `duration` hours, minus the `elapsed` seconds already past; returns immediately.
+    """
+    total_checks = (duration * 60) // interval - int(elapsed // (interval * 60))  # Convert hours to minute intervals
+    if total_checks <= 0:
+        return False
 
-        # If the token is new, insert it
-        print(f" Inserting {token_data.get('tokenName')} into DB...")
+    return tracking_scheduler.schedule(
+        f"price:{token_address}", record_price_tick, args=(token_address, token_name),
+        interval=interval * 60, runs=total_checks
+    )
 
+
+def resume_price_tracking():
+    """
+    Reschedules price tracking for tokens paid within the last PRICE_TRACK_HOURS, picking up where each left off.
+    After a warm start restored tokens are deduped and never reach save_dex_paid_token again. Returns how many resumed.
+    """
+    with db_pool.connection() as conn, conn.cursor() as cursor:
         cursor.execute("""
-            INSERT INTO tokens (token_name, symbol, contract_address, market_cap_at_dex_paid, highest_market_cap, pair_created_at, dex_paid_at, ath_timestamp)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-        """, (
-            token_data.get("tokenName"),
-            token_data.get("tokenSymbol"),
-            token_data.get("contractAddress"),
-            market_cap,  # ✅ Market Cap at DEX Paid time is stored permanently
-            market_cap,  # ✅ Start `highest_market_cap` at `market_cap` initially
-            token_data.get("pairCreatedAt"),
-            token_data.get("dexPaidAt"),
-            datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S UTC')  # ✅ Set ATH timestamp initially
-        ))
+            SELECT contract_address, token_name, EXTRACT(EPOCH FROM COALESCE(dex_paid_at, logged_at))
+            FROM tokens
+            WHERE contract_address IS NOT NULL
+              AND COALESCE(dex_paid_at, logged_at) > (NOW() AT TIME ZONE 'UTC') - make_interval(secs => %s)
+        """, (PRICE_TRACK_HOURS * 3600,))
+        rows = cursor.fetchall()
+
+    wall_now = time.time()
+    resumed = 0
+    for address, token_name, paid_at in rows:
+        if track_price_changes(address, token_name, elapsed=max(0.0, wall_now - float(paid_at))):
+            resumed += 1
+    return resumed
+
+class AthToken:
+    __slots__ = ("address", "highest", "paid_at", "market_cap", "volatility", "tier", "due")
+
+    def __init__(self, address, highest, paid_at):
+        self.address = address
+        self.highest = highest
+        self.paid_at = paid_at  # Unix seconds
+        self.market_cap = None
+        self.volatility = 0.0  # Smoothed relative market cap move per refresh
+        self.tier = None
+        self.due = 0.0
+
+
+def ath_tier(age, volatility, market_cap, highest):
+    """
+    Picks a refresh tier from the age since DEX paid, one step hotter for volatile tokens or tokens
+    trading near their ATH, one step colder for quiet tokens far below it. None means retired.
+    """
+    for step, max_age in enumerate(ATH_TIER_MAX_AGES):
+        if age < max_age:
+            break
+    else:
+        return None
+
+    if market_cap is not None and highest:
+        if volatility >= ATH_VOLATILE_MOVE or market_cap >= highest * ATH_NEAR_HIGH_SHARE:
+            step -= 1
+        elif market_cap < highest * ATH_FAR_FROM_HIGH_SHARE:
+            step += 1
+    elif volatility >= ATH_VOLATILE_MOVE:
+        step -= 1
+    return ATH_TIERS[max(0, min(step, len(ATH_TIERS) - 1))]
+
+
+class AthRefreshScheduler:
+    """
+    Refreshes market caps on a per-token cadence instead of sweeping every stored token:
+    tokens sit in a due-time heap by tier, and each tick batch-fetches only the due ones.
+    Tokens older than the last tier's age are retired and no longer loaded.
+    """
 
+    def __init__(self):
+        self._tokens = {}
+        self._heap = []  # (due, seq, address)
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+        self.refreshed = 0
+        self.retired = 0
+
+    def track(self, address, highest, paid_at):
+        """
+        Adds a token (refreshed on the next tick) or raises its known high. Returns True if it was new.
+        """
+        with self._lock:
+            token = self._tokens.get(address)
+            if token is None:
+                token = self._tokens[address] = AthToken(address, highest, paid_at)
+                self._push(token, time.monotonic())
+                return True
+            if highest is not None and (token.highest is None or highest > token.highest):
+                token.highest = highest  # Raised elsewhere, e.g. by save_token_data
+            return False
+
+    def forget(self, address):
+        with self._lock:
+            return self._tokens.pop(address, None) is not None
+
+    def reload(self):
+        """
+        Syncs with the tokens table: picks up new tokens and drops ones that have retired.
+        """
+        with db_pool.connection() as conn, conn.cursor() as cursor, metrics.timer("db_statement_duration_seconds", statement="select_ath_tokens"):
+            cursor.execute("""
+                SELECT contract_address, highest_market_cap, EXTRACT(EPOCH FROM COALESCE(dex_paid_at, logged_at))
+                FROM tokens
+                WHERE contract_address IS NOT NULL
+                  AND COALESCE(dex_paid_at, logged_at) > (NOW() AT TIME ZONE 'UTC') - make_interval(secs => %s)
+            """, (ATH_TIER_MAX_AGES[-1],))
+            rows = cursor.fetchall()
+
+        active = set()
+        for address, highest, paid_at in rows:
+            active.add(address)
+            self.track(address, highest, float(paid_at))
+
+        with self._lock:
+            for address in [address for address in self._tokens if address not in active]:
+                del self._tokens[address]
+                self.retired += 1
+
+    def due_tokens(self, now=None):
+        now = time.monotonic() if now is None else now
+        due = []
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now:
+                due_at, _, address = heapq.heappop(self._heap)
+                token = self._tokens.get(address)
+                if token is not None and token.due == due_at:  # Skip retired tokens and stale entries
+                    due.append(token)
+        return due
+
+    def refresh(self, tokens):
+        """
+        Fetches current market caps for `tokens`, records new highs and reschedules each by its new tier.
+        A token's known high is only raised once its new high is committed, so a failed write is retried
+        on the token's next refresh.
+        """
+        try:
+            pairs_by_address = get_tokens_pairs_batch(TARGET_CHAIN_ID, [token.address for token in tokens])
+        except Exception as e:
+            logger.error("❌ ATH refresh lookup failed - %s", e)
+            pairs_by_address = {}
+
+        new_highs = []
+        now = time.monotonic()
+        wall_now = time.time()
+        with self._lock:
+            for token in tokens:
+                pairs = pairs_by_address.get(token.address)
+                if pairs:
+                    market_cap = pairs[0].market_cap or 0.0
+                    if token.market_cap:
+                        move = abs(market_cap - token.market_cap) / token.market_cap
+                        token.volatility += ATH_VOLATILITY_SMOOTHING * (move - token.volatility)
+                    token.market_cap = market_cap
+
+                highest = token.highest
+                if token.market_cap is not None and (highest is None or token.market_cap > highest):
+                    new_highs.append((token.address, token.market_cap))
+                    highest = token.market_cap
+
+                tier = ath_tier(wall_now - token.paid_at, token.volatility, token.market_cap, highest)
+                if tier is None:
+                    self._tokens.pop(token.address, None)
+                    self.retired += 1
+                    continue
+                token.tier = tier
+                self._push(token, now + ATH_TIER_INTERVALS[tier])
+            self.refreshed += len(tokens)
+
+        if not new_highs:
+            return
+        try:
+            save_new_highs(new_highs)
+        except Exception as e:
+            logger.error("❌ Failed to save %d new ATHs - %s", len(new_highs), e)
+            return
+        with self._lock:
+            for address, market_cap in new_highs:
+                logger.info("📈 New ATH for %s: %s", address, market_cap)
+                token = self._tokens.get(address)
+                if token is not None and (token.highest is None or market_cap > token.highest):
+                    token.highest = market_cap
+
+    def tier_counts(self):
+        with self._lock:
+            counts = dict.fromkeys(ATH_TIERS, 0)
+            for token in self._tokens.values():
+                if token.tier is not None:
+                    counts[token.tier] += 1
+            return counts
+
+    def stats(self):
+        with self._lock:
+            tracked = len(self._tokens)
+        return {"tracked": tracked, "tiers": self.tier_counts(), "refreshed": self.refreshed, "retired": self.retired}
+
+    def _push(self, token, due):
+        token.due = due
+        heapq.heappush(self._heap, (due, next(self._seq), token.address))
+
+ath_scheduler = AthRefreshScheduler()
+
+
+def save_new_highs(new_highs):
+    """
+    Pushes every new high from one refresh in one set-based statement and one commit.
+    """
+    with db_pool.connection() as conn, conn.cursor() as cursor, metrics.timer("db_statement_duration_seconds", statement="update_ath"):
+        psycopg2.extras.execute_values(cursor, """
+            UPDATE tokens AS t
+            SET highest_market_cap = GREATEST(t.highest_market_cap, v.market_cap),
+                ath_timestamp = NOW() AT TIME ZONE 'UTC'
+            FROM (VALUES %s) AS v (contract_address, market_cap)
+            WHERE t.contract_address = v.contract_address
+              AND (t.highest_market_cap IS NULL OR v.market_cap > t.highest_market_cap)
+        """, new_highs, template="(%s, %s::double precision)", page_size=len(new_highs))
         conn.commit()
-        print(f" ✅ Successfully saved {token_data.get('tokenName')} to the database.")
 
+
+def track_ath_market_cap(reload=True):
+    """
+    Continuously checks active tokens for new All-Time Highs (ATH).
+    Each token is refreshed at its tier's cadence, so API calls scale with active tokens, not stored ones.
+    With reload=False the token set is fed by the caller (a worker's leases) instead of the tokens table.
+    """
+    last_reload = None
+    while True:
+        try:
+            if reload and (last_reload is None or time.monotonic() - last_reload >= ATH_RELOAD_INTERVAL):
+                ath_scheduler.reload()
+                last_reload = time.monotonic()
+
+            due = ath_scheduler.due_tokens()
+            if due:
+                ath_scheduler.refresh(due)
+
+        except Exception as e:
+            logger.error("❌ Failed to track ATH market cap - %s", e)
+        time.sleep(ATH_TICK_INTERVAL)
+
+
+def offer_tracking_lease(token_address):
+    """
+    Makes a token claimable by tracking workers.
+    """
+    try:
+        with db_pool.connection() as conn, conn.cursor() as cursor:
+            cursor.execute("INSERT INTO tracking_leases (contract_address) VALUES (%s) ON CONFLICT DO NOTHING", (token_address,))
+            conn.commit()
     except Exception as e:
-        print(f" ❌ ERROR: Failed to save token to DB - {e}")
+        logger.error("❌ Failed to offer %s to tracking workers - %s", token_address, e)
 
-    finally:
-        if cursor:
-            cursor.close()
-        if conn:
-            conn.close()
 
-def track_price_changes(token_address, token_name, duration=6, interval=1):
-    headers = ["Token Name", "Token Address", "Timestamp", "Price USD"]
-    
-    total_checks = (duration * 60) // interval  # Convert hours to minute intervals
+class TrackingLeaseManager:
+    """
+    Claims this worker's share of active tokens from tracking_leases and tracks only those.
+    Every round it heartbeats, renews its leases, then releases or claims (FOR UPDATE SKIP LOCKED)
+    until it holds ceil(active tokens / live workers). A joining worker shrinks everyone's share;
+    a dead worker's leases expire after LEASE_TTL and are claimed by the others.
+    """
 
-    for _ in range(total_checks):
-        pairs = get_token_pairs(TARGET_CHAIN_ID, token_address)
-        price_usd = pairs[0].get("priceUsd") if pairs else "Unknown"
-        timestamp = datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S UTC')
+    def __init__(self, worker_id=None, lease_ttl=LEASE_TTL, renew_interval=LEASE_RENEW_INTERVAL):
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self.lease_ttl = lease_ttl
+        self.renew_interval = renew_interval
+        self.held = set()
+        self._last_sync = None
+        self.claimed = 0
+        self.released = 0
+        self.lost = 0
+
+    def run_forever(self):
+        logger.info("🧩 Tracking worker %s started", self.worker_id)
+        while True:
+            try:
+                if self._last_sync is None or time.monotonic() - self._last_sync >= LEASE_SYNC_INTERVAL:
+                    self.sync()
+                    self._last_sync = time.monotonic()
+                self.run_round()
+            except Exception as e:
+                logger.error("❌ Lease round failed for %s - %s", self.worker_id, e)
+            time.sleep(self.renew_interval)
+
+    def sync(self):
+        """
+        Backfills leases for active tokens and drops leases of retired ones. Idempotent across workers.
+        """
+        with db_pool.connection() as conn, conn.cursor() as cursor:
+            cursor.execute("""
+                INSERT INTO tracking_leases (contract_address)
+                SELECT contract_address FROM tokens
+                WHERE contract_address IS NOT NULL
+                  AND COALESCE(dex_paid_at, logged_at) > (NOW() AT TIME ZONE 'UTC') - make_interval(secs => %s)
+                ON CONFLICT DO NOTHING
+            """, (ATH_TIER_MAX_AGES[-1],))
+            cursor.execute("""
+                DELETE FROM tracking_leases AS l
+                WHERE NOT EXISTS (
+                    SELECT 1 FROM tokens AS t
+                    WHERE t.contract_address = l.contract_address
+                      AND COALESCE(t.dex_paid_at, t.logged_at) > (NOW() AT TIME ZONE 'UTC') - make_interval(secs => %s)
+                )
+            """, (ATH_TIER_MAX_AGES[-1],))
+            cursor.execute("DELETE FROM tracking_workers WHERE heartbeat_at < NOW() - make_interval(secs => %s)",
+                           (self.lease_ttl * 10,))
+            conn.commit()
 
-        conn = None
-        cursor = None
+    def run_round(self):
+        with db_pool.connection() as conn, conn.cursor() as cursor, metrics.timer("db_statement_duration_seconds", statement="lease_round"):
+            cursor.execute("""
+                INSERT INTO tracking_workers (worker_id) VALUES (%s)
+                ON CONFLICT (worker_id) DO UPDATE SET heartbeat_at = NOW()
+            """, (self.worker_id,))
 
-        try:
-            conn = psycopg2.connect(dbname=DB_NAME, user=DB_USER, password=DB_PASSWORD, host=DB_HOST, port=DB_PORT)
-            cursor = conn.cursor()
+            cursor.execute("""
+                UPDATE tracking_leases SET lease_expires_at = NOW() + make_interval(secs => %s)
+                WHERE worker_id = %s
+                RETURNING contract_address
+            """, (self.lease_ttl, self.worker_id))
+            held = {row[0] for row in cursor.fetchall()}
 
             cursor.execute("""
-                INSERT INTO prices (token_name, token_address, timestamp, price_usd)
-                VALUES (%s, %s, %s, %s)
-            """, (token_name, token_address, timestamp, price_usd))
+                SELECT
+                    (SELECT COUNT(*) FROM tracking_leases),
+                    (SELECT COUNT(*) FROM tracking_workers WHERE heartbeat_at > NOW() - make_interval(secs => %s))
+            """, (self.lease_ttl,))
+            active, live_workers = cursor.fetchone()
+            share = -(-active // max(1, live_workers))
+
+            released = set()
+            claimed = set()
+            if len(held) > share:
+                cursor.execute("""
+                    UPDATE tracking_leases SET worker_id = NULL, lease_expires_at = NULL
+                    WHERE contract_address IN (
+                        SELECT contract_address FROM tracking_leases
+                        WHERE worker_id = %s
+                        ORDER BY contract_address
+                        LIMIT %s
+                    )
+                    RETURNING contract_address
+                """, (self.worker_id, len(held) - share))
+                released = {row[0] for row in cursor.fetchall()}
+            elif len(held) < share:
+                cursor.execute("""
+                    UPDATE tracking_leases
+                    SET worker_id = %s, lease_expires_at = NOW() + make_interval(secs => %s)
+                    WHERE contract_address IN (
+                        SELECT contract_address FROM tracking_leases
+                        WHERE worker_id IS NULL OR lease_expires_at < NOW()
+                        ORDER BY contract_address
+                        LIMIT %s
+                        FOR UPDATE SKIP LOCKED
+                    )
+                    RETURNING contract_address
+                """, (self.worker_id, self.lease_ttl, share - len(held)))
+                claimed = {row[0] for row in cursor.fetchall()}
 
             conn.commit()
 
+        # Leases missing from the renewal expired while this worker stalled (or retired in a sync)
+        new_held = (held - released) | claimed
+        self.lost += len(self.held - held)
+        self.claimed += len(claimed)
+        self.released += len(released)
+        self._stop(self.held - new_held)
+        self._start(new_held - self.held)
+        self.held = new_held
+        if claimed or released:
+            logger.info("🧩 %s holds %d/%d tokens (%d live workers, +%d -%d)",
+                        self.worker_id, len(new_held), active, live_workers, len(claimed), len(released))
+
+    def release_all(self):
+        """
+        Hands every lease back on shutdown so other workers can claim them without waiting for expiry.
+        """
+        try:
+            with db_pool.connection() as conn, conn.cursor() as cursor:
+                cursor.execute("UPDATE tracking_leases SET worker_id = NULL, lease_expires_at = NULL WHERE worker_id = %s",
+                               (self.worker_id,))
+                cursor.execute("DELETE FROM tracking_workers WHERE worker_id = %s", (self.worker_id,))
+                conn.commit()
         except Exception as e:
-            print(f"ERROR: Failed to track price for {token_name} - {e}")
+            logger.error("❌ Failed to release leases for %s - %s", self.worker_id, e)
+        self._stop(self.held)
+        self.held = set()
 
-        finally:
-            if cursor:
-                cursor.close()
-            if conn:
-                conn.close()  # Ensure connection is closed
+    def stats(self):
+        return {"held": len(self.held), "claimed": self.claimed, "released": self.released, "lost": self.lost}
+
+    def _start(self, addresses):
+        if not addresses:
+            return
+        with db_pool.connection() as conn, conn.cursor() as cursor:
+            cursor.execute("""
+                SELECT contract_address, token_name, highest_market_cap, EXTRACT(EPOCH FROM COALESCE(dex_paid_at, logged_at))
+                FROM tokens
+                WHERE contract_address = ANY(%s)
+            """, (list(addresses),))
+            rows = cursor.fetchall()
+
+        wall_now = time.time()
+        for address, token_name, highest, paid_at in rows:
+            paid_at = float(paid_at) if paid_at is not None else wall_now
+            ath_scheduler.track(address, highest, paid_at)
+            track_price_changes(address, token_name, elapsed=max(0.0, wall_now - paid_at))
 
-        time.sleep(interval * 60)  # Wait before next check
+    def _stop(self, addresses):
+        for address in addresses:
+            ath_scheduler.forget(address)
+            tracking_scheduler.cancel(f"price:{address}")
 
-def track_ath_market_cap():
+
+def process_rate_limits(kind, detectors, workers, scale=1.0):
     """
-    Continuously checks all saved tokens for new All-Time Highs (ATH).
-    Runs every 20 seconds for a few hours.
+    Returns (limits, default_limit) for one `kind` process ("detector" or "worker") on a host running
+    `detectors` + `workers` processes that share its quota. Each family is split among the processes that
+    call it (RATE_LIMIT_USERS); a family this kind never calls gets an even split across the host.
     """
-    while True:
+    counts = {"detector": detectors, "worker": workers}
+    host_processes = max(1, detectors + workers)
+    limits = {}
+    for family, limit in RATE_LIMITS.items():
+        users = RATE_LIMIT_USERS.get(family, ())
+        sharing = sum(counts[user] for user in users) if kind in users else host_processes
+        limits[family] = limit * scale / max(1, sharing)
+    return limits, RATE_LIMIT_DEFAULT * scale / host_processes
+
+
+def set_rate_limits(limits, default_limit):
+    """
+    Replaces the process-wide rate limiter with one enforcing these per-minute limits.
+    """
+    global rate_limiter
+    rate_limiter = RateLimiter(limits=limits, default_limit=default_limit)
+
+
+def run_tracking_worker(index=0, rate_limits=None):
+    """
+    Runs one tracking worker in this process: leases a fair share of tokens, then tracks ATH and prices
+    for those only. `rate_limits` is a (limits, default_limit) pair from process_rate_limits. Blocks forever.
+    """
+    if rate_limits is not None:
+        set_rate_limits(*rate_limits)
+    if METRICS_PORT is not None:
+        start_metrics_server(METRICS_PORT + 1 + index)
+
+    lease_manager = TrackingLeaseManager()
+    atexit.register(lease_manager.release_all)
+    metrics.gauge("tracking_leases_held", "Tokens this worker currently holds a tracking lease for.",
+                  lambda: len(lease_manager.held))
+
+    threading.Thread(target=track_ath_market_cap, kwargs={"reload": False}, name="ath-tracker", daemon=True).start()
+    lease_manager.run_forever()
+
+
+def spawned_tracking_worker(index, rate_limits):
+    """
+    Entry point of a worker process started with --workers.
+    """
+    setup_logging()
+    exit_on_sigterm()
+    try:
+        run_tracking_worker(index, rate_limits)
+    except KeyboardInterrupt:
+        pass
+
+
+def start_tracking_workers(count, rate_limits, first_index=0):
+    """
+    Starts `count` worker processes. "spawn" rather than fork, so none inherits this process's
+    pooled DB connections or threads.
+    """
+    context = multiprocessing.get_context("spawn")
+    processes = []
+    for index in range(first_index, first_index + count):
+        process = context.Process(target=spawned_tracking_worker, args=(index, rate_limits),
+                                  name=f"tracking-worker-{index}", daemon=True)
+        process.start()
+        processes.append(process)
+    return processes
+
+
+class DedupeStore:
+    """
+    On-disk copy of already_paid_dex_tokens in a local SQLite file.
+    Loaded at startup so a restart doesn't re-check, re-save or re-track tokens we already handled.
+    """
+
+    def __init__(self, path=DEDUPE_STATE_FILE, ttl=DEDUPE_TTL):
+        self.path = path
+        self.ttl = ttl
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS seen_tokens (
+                    token_address TEXT PRIMARY KEY,
+                    seen_at REAL NOT NULL
+                ) WITHOUT ROWID
+            """)
+        return self._conn
+
+    def load(self, cache):
+        """
+        Prunes expired entries and copies the rest into `cache`; returns how many were restored.
+        """
+        cutoff = time.time() - self.ttl
+        with self._lock:
+            conn = self._connect()
+            conn.execute("DELETE FROM seen_tokens WHERE seen_at < ?", (cutoff,))
+            rows = conn.execute("SELECT token_address, seen_at FROM seen_tokens ORDER BY seen_at").fetchall()
+
+        for token_address, seen_at in rows:
+            cache.add(token_address, seen_at)  # Keeps each token's original expiry
+        return len(rows)
+
+    def add(self, token_address, seen_at=None):
         try:
-            conn = psycopg2.connect(
-                dbname=DB_NAME, user=DB_USER, password=DB_PASSWORD, host=DB_HOST, port=DB_PORT
-            )
-            cursor = conn.cursor()
-
-            # Fetch all tokens from the database
-            cursor.execute("SELECT contract_address, highest_market_cap FROM tokens")
-            tokens = cursor.fetchall()
-
-            for contract_address, highest_market_cap in tokens:
-                # Get current market cap from API
-                pairs = get_token_pairs(TARGET_CHAIN_ID, contract_address)
-                if not pairs:
-                    continue  # Skip if no data found
-                
-                current_market_cap = float(pairs[0].get("marketCap", 0))
-
-                if current_market_cap > highest_market_cap:
-                    new_ath_time = datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S UTC')
-                    print(f"📈 New ATH for {contract_address}: {current_market_cap} at {new_ath_time}")
-
-                    # Update database with new ATH
-                    cursor.execute("""
-                        UPDATE tokens 
-                        SET highest_market_cap = %s, ath_timestamp = %s 
-                        WHERE contract_address = %s
-                    """, (current_market_cap, new_ath_time, contract_address))
-
-                    conn.commit()
-
-            cursor.close()
-            conn.close()
+            with self._lock:
+                self._connect().execute(
+                    "INSERT OR REPLACE INTO seen_tokens (token_address, seen_at) VALUES (?, ?)",
+                    (token_address, seen_at if seen_at is not None else time.time())
+                )
+        except sqlite3.Error as e:
+            logger.warning("⚠️ Failed to persist dedupe state for %s - %s", token_address, e)
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+dedupe_store = DedupeStore()
+atexit.register(dedupe_store.close)
+
+
+class PairResolutionQueue:
+    """
+    Resolves pairs for freshly paid tokens without blocking the scan.
+    Lookups run on their own scheduler at PAIR_RESOLUTION_DELAYS after detection until pairs appear;
+    resolution latency and attempts per token are recorded.
+    """
+
+    def __init__(self, delays=PAIR_RESOLUTION_DELAYS, max_workers=PAIR_RESOLUTION_WORKERS):
+        self.delays = delays
+        self.scheduler = TrackingScheduler(max_workers=max_workers)
+        self._lock = threading.Lock()
+        self._pending = set()
+        self.resolved = 0
+        self.gave_up = 0
+        self.latency_total = 0.0
+        self.latency_max = 0.0
+        self.attempts = {}  # attempts needed -> tokens resolved
+
+    def submit(self, chain_id, token_address, dex_paid_details):
+        with self._lock:
+            if token_address in self._pending:
+                return False
+            self._pending.add(token_address)
+        self._schedule(chain_id, token_address, dex_paid_details, time.monotonic(), 1)
+        return True
+
+    def _schedule(self, chain_id, token_address, dex_paid_details, detected_at, attempt):
+        delay = max(0.0, detected_at + self.delays[attempt - 1] - time.monotonic())
+        self.scheduler.schedule(
+            f"pairs:{token_address}:{attempt}", self._attempt,
+            args=(chain_id, token_address, dex_paid_details, detected_at, attempt), runs=1, delay=delay
+        )
+
+    def _attempt(self, chain_id, token_address, dex_paid_details, detected_at, attempt):
+        pairs = get_token_pairs(chain_id, token_address)
+
+        if not pairs and attempt < len(self.delays):
+            self._schedule(chain_id, token_address, dex_paid_details, detected_at, attempt + 1)
+            return
+
+        # Persist once handled either way, so a restart neither repeats nor loses in-flight tokens
+        dedupe_store.add(token_address)
+
+        latency = time.monotonic() - detected_at
+        with self._lock:
+            self._pending.discard(token_address)
+            if pairs:
+                metrics.observe("pair_resolution_latency_seconds", latency)
+                self.resolved += 1
+                self.latency_total += latency
+                self.latency_max = max(self.latency_max, latency)
+                self.attempts[attempt] = self.attempts.get(attempt, 0) + 1
+            else:
+                self.gave_up += 1
+
+        if not pairs:
+            logger.info("No pairs found for %s after %d attempts, skipping database save.", token_address, attempt)
+            return
+
+        logger.info("Pairs resolved for %s in %.1fs (%d attempt(s))", token_address, latency, attempt)
+        save_dex_paid_token(token_address, dex_paid_details, pairs)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "pending": len(self._pending),
+                "resolved": self.resolved,
+                "gave_up": self.gave_up,
+                "latency_avg_seconds": self.latency_total / self.resolved if self.resolved else 0.0,
+                "latency_max_seconds": self.latency_max,
+                "attempts": dict(self.attempts),
+            }
+
+pair_resolution_queue = PairResolutionQueue()
+
+
+def handle_dex_paid_token(chain_id, token_address, dex_paid_details):
+    """
+    Marks a freshly detected DEX paid token as seen and queues its pair resolution.
+    """
+    logger.info("💰 %s is DEX PAID!", token_address)
+
+    # Add token to the cache
+    already_paid_dex_tokens.add(token_address)
+
+    if replay_client is not None:
+        listed_at = replay_client.listed_at(token_address)
+        if listed_at is not None:
+            metrics.observe("replay_detection_latency_seconds", max(0.0, replay_client.clock() - listed_at))
+
+    # ⏳ Pairs take a moment to appear; resolve them off the scan path
+    pair_resolution_queue.submit(chain_id, token_address, dex_paid_details)
 
-        except Exception as e:
-            print(f"❌ ERROR: Failed to track ATH market cap - {e}")
 
-        time.sleep(20)  # Wait 20 seconds before checking again
+def save_dex_paid_token(token_address, dex_paid_details, pairs):
+    """
+    Saves a DEX paid token once its pairs are known and starts price tracking.
+    """
+    global dex_paid_sniped, latest_dex_paid_time
+
+    token = TokenSnapshot.from_pair(pairs[0], dex_paid_details)
+    dex_paid_at = token.dex_paid_at
+
+    logger.debug("Calling save_token_data() for %s", token.token_name)
+    save_token_data(token)
+
+    if sharded_tracking:
+        offer_tracking_lease(token_address)  # A worker claims it on its next round
+    else:
+        track_price_changes(token_address, token.token_name)
+        ath_scheduler.track(token_address, token.market_cap, dex_paid_at / 1000 if dex_paid_at else time.time())  # Hot right away
+
+    with counters_lock:
+        dex_paid_sniped += 1
+        latest_dex_paid_time = datetime.now()
+
+
+class FeedDiffer:
+    """
+    Fingerprints each token-profiles/latest entry and forwards only new or changed ones,
+    so a mostly unchanged poll costs work proportional to its delta.
+    """
+
+    def __init__(self, maxsize=FEED_SEEN_MAXSIZE):
+        self.maxsize = maxsize
+        self._seen = OrderedDict()  # (chain_id, token_address) -> fingerprint
+        self.last_poll = {"new": 0, "changed": 0, "unchanged": 0, "rechecked": 0}
+        self.totals = dict(self.last_poll)
+
+    def diff(self, token_profiles, recheck=None):
+        """
+        Returns the new and changed entries, plus unchanged ones for which `recheck(profile)` is true.
+        """
+        counts = {"new": 0, "changed": 0, "unchanged": 0, "rechecked": 0}
+        delta = []
+
+        for profile in token_profiles:
+            key = (profile.chain_id, profile.token_address)
+            fingerprint = profile.fingerprint
+            previous = self._seen.get(key)
+
+            if previous == fingerprint:
+                counts["unchanged"] += 1
+                self._seen.move_to_end(key)
+                if recheck is not None and recheck(profile):
+                    counts["rechecked"] += 1
+                    delta.append(profile)
+                continue
+
+            counts["new" if previous is None else "changed"] += 1
+            self._seen[key] = fingerprint
+            self._seen.move_to_end(key)
+            delta.append(profile)
+
+        while len(self._seen) > self.maxsize:
+            self._seen.popitem(last=False)
+
+        self.last_poll = counts
+        for name, count in counts.items():
+            self.totals[name] += count
+        return delta
+
+feed_differ = FeedDiffer()
+
+
+def profile_needs_recheck(profile):
+    """
+    True for unchanged feed entries whose not-paid backoff has elapsed.
+    """
+    token_address = profile.token_address
+    return (
+        profile.chain_id == TARGET_CHAIN_ID
+        and token_address not in already_paid_dex_tokens
+        and not_paid_cache.should_check(token_address)
+    )
 
 
 def inspect_token_profiles(token_profiles):
-    global tokens_scanned, dex_paid_sniped, latest_dex_paid_time
+    global tokens_scanned
 
     for profile in token_profiles:
-        tokens_scanned += 1
-        token_address = profile.get("tokenAddress")
-        chain_id = profile.get("chainId")
+        with counters_lock:
+            tokens_scanned += 1
+        token_address = profile.token_address
+        chain_id = profile.chain_id
 
         if not token_address or not chain_id or chain_id != TARGET_CHAIN_ID:
-            print(f"DEBUG: Skipping {token_address} (Invalid Chain or Missing Address)")
+            logger.debug("Skipping %s (Invalid Chain or Missing Address)", token_address)
+            continue
+
+        if token_address in already_paid_dex_tokens or not not_paid_cache.should_check(token_address):
             continue
 
-        print(f"DEBUG: Checking {token_address} on {chain_id}")  # ADDED
+        logger.debug("Checking %s on %s", token_address, chain_id)
+
+        paid, dex_paid_details = is_dex_paid(chain_id, token_address)
 
-        if token_address not in already_paid_dex_tokens:
-            paid, dex_paid_details = is_dex_paid(chain_id, token_address)
+        if paid:
+            not_paid_cache.forget(token_address)
+            handle_dex_paid_token(chain_id, token_address, dex_paid_details)
         else:
-            paid, dex_paid_details = False, None  # Ensure paid is always defined
+            not_paid_cache.record_not_paid(token_address)
+
+
+async def inspect_token_profiles_async(token_profiles, max_concurrency=DEX_PAID_CHECK_CONCURRENCY):
+    """
+    Same as inspect_token_profiles, but runs the orders/v1 checks for a batch concurrently.
+    At most `max_concurrency` checks are in flight, so one slow response only delays itself.
+    """
+    global tokens_scanned
+
+    loop = asyncio.get_running_loop()
+    semaphore = asyncio.Semaphore(max_concurrency)
 
+    async def check_profile(chain_id, token_address):
+        async with semaphore:
+            paid, dex_paid_details = await loop.run_in_executor(dex_paid_check_executor, is_dex_paid, chain_id, token_address)
         if paid:
-            print(f"  {token_address} is DEX PAID!")
+            not_paid_cache.forget(token_address)
+            # Handled as soon as this check lands, not after the whole batch
+            handle_dex_paid_token(chain_id, token_address, dex_paid_details)
+        else:
+            not_paid_cache.record_not_paid(token_address)
 
-            # Add token to the cache
-            already_paid_dex_tokens[token_address] = datetime.now()
+    pending = set()
+    tasks = []
+    for profile in token_profiles:
+        with counters_lock:
+            tokens_scanned += 1
+        token_address = profile.token_address
+        chain_id = profile.chain_id
 
-            # ⏳ Small delay to allow pairs to appear
-            time.sleep(3)  # Wait 3 seconds
+        if not token_address or not chain_id or chain_id != TARGET_CHAIN_ID:
+            logger.debug("Skipping %s (Invalid Chain or Missing Address)", token_address)
+            continue
 
-            pairs = get_token_pairs(chain_id, token_address)
-            if not pairs:
-                print(f"  No pairs found for {token_address}, skipping database save.")
-                continue  # ✅ Use continue instead of return
+        # Skip known tokens, unpaid tokens still backing off and duplicates within the same batch
+        if token_address in already_paid_dex_tokens or token_address in pending:
+            continue
+        if not not_paid_cache.should_check(token_address):
+            continue
+        pending.add(token_address)
 
-            pair_data = pairs[0]  # ✅ Correctly placed outside if block
+        logger.debug("Checking %s on %s", token_address, chain_id)
+        tasks.append(asyncio.create_task(check_profile(chain_id, token_address)))
+
+    if tasks:
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        for result in results:
+            if isinstance(result, Exception):
+                logger.error("❌ DEX paid check failed - %s", result)
+
+
+class AdaptivePoller:
+    """
+    Picks the delay before the next token-profiles/latest poll.
+    Tracks an EWMA of new profiles per second and aims for POLL_TARGET_NEW_PER_POLL per poll,
+    clamped to [POLL_MIN_INTERVAL, POLL_MAX_INTERVAL] and never sooner than an active Retry-After.
+    """
 
-            # Convert timestamps
-            pair_created_at = datetime.fromtimestamp(int(pair_data.get("pairCreatedAt", 0)) / 1000, tz=timezone.utc).strftime('%Y-%m-%d %H:%M:%S UTC') if pair_data.get("pairCreatedAt") else None
-            dex_paid_at = datetime.fromtimestamp(int(dex_paid_details.get("paymentTimestamp", 0)) / 1000, tz=timezone.utc).strftime('%Y-%m-%d %H:%M:%S UTC') if dex_paid_details and dex_paid_details.get("paymentTimestamp") else None
-            
-            token_name = pair_data.get("baseToken", {}).get("name")
-            market_cap = pair_data.get("marketCap", 0)
+    def __init__(self, min_interval=POLL_MIN_INTERVAL, max_interval=POLL_MAX_INTERVAL,
+                 target_new_per_poll=POLL_TARGET_NEW_PER_POLL, smoothing=POLL_RATE_SMOOTHING):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.target_new_per_poll = target_new_per_poll
+        self.smoothing = smoothing
+        self.interval = min(max(1.0, min_interval), max_interval)
+        self.launch_rate = 0.0  # New profiles per second (EWMA)
+        self.polls = 0
+        self.rate_limited_polls = 0
+        self.last_achieved = None
+        self.avg_achieved = None
+        self.min_achieved = None
+        self.max_achieved = None
+        self._last_poll_at = None
+
+    def start_poll(self):
+        """
+        Call at the start of every poll; records the achieved inter-poll interval.
+        """
+        now = time.monotonic()
+        if self._last_poll_at is not None:
+            achieved = now - self._last_poll_at
+            self.last_achieved = achieved
+            self.avg_achieved = achieved if self.avg_achieved is None else 0.9 * self.avg_achieved + 0.1 * achieved
+            self.min_achieved = achieved if self.min_achieved is None else min(self.min_achieved, achieved)
+            self.max_achieved = achieved if self.max_achieved is None else max(self.max_achieved, achieved)
+        self._last_poll_at = now
+        self.polls += 1
+
+    def observe(self, new_profiles):
+        """
+        Feeds the number of new profiles the last poll surfaced back into the cadence.
+        """
+        elapsed = self.last_achieved or self.interval
+        rate = new_profiles / elapsed
+        self.launch_rate = self.smoothing * rate + (1 - self.smoothing) * self.launch_rate
+
+        if self.launch_rate > 0:
+            interval = self.target_new_per_poll / self.launch_rate
+        else:
+            interval = self.max_interval
+        self.interval = min(max(interval, self.min_interval), self.max_interval)
+
+    def next_delay(self):
+        blocked = rate_limiter.blocked_for("token-profiles")
+        if blocked > self.interval:
+            self.rate_limited_polls += 1
+            return blocked
+        return self.interval
+
+    def stats(self):
+        return {
+            "interval": self.interval,
+            "launch_rate": self.launch_rate,
+            "polls": self.polls,
+            "rate_limited_polls": self.rate_limited_polls,
+            "last_achieved_interval": self.last_achieved,
+            "avg_achieved_interval": self.avg_achieved,
+            "min_achieved_interval": self.min_achieved,
+            "max_achieved_interval": self.max_achieved,
+        }
+
+poller = AdaptivePoller()
+
+
+def set_timer_speed(speed):
+    """
+    Runs the detection-path timers `speed` times faster: poll cadence, not-paid rechecks, pair resolution
+    and request retries. An accelerated replay then sees them at their recorded pace, so detection latency
+    measured on the replay clock matches a 1x run.
+    """
+    global timer_speed
+    timer_speed = speed
+    poller.min_interval = POLL_MIN_INTERVAL / speed
+    poller.max_interval = POLL_MAX_INTERVAL / speed
+    poller.interval = min(max(poller.interval / speed, poller.min_interval), poller.max_interval)
+    not_paid_cache.delays = tuple(delay / speed for delay in NOT_PAID_RECHECK_DELAYS)
+    not_paid_cache.max_delay = NOT_PAID_MAX_RECHECK_DELAY / speed
+    pair_resolution_queue.delays = tuple(delay / speed for delay in PAIR_RESOLUTION_DELAYS)
 
 
-            print(f"DEBUG: Calling save_token_data() for {token_name}")
-            save_token_data({
-                "tokenName": token_name,
-                "tokenSymbol": pair_data.get("baseToken", {}).get("symbol"),
-                "contractAddress": pair_data.get("baseToken", {}).get("address"),
-                "marketCap": market_cap,
-                "pairCreatedAt": pair_created_at,
-                "dexPaidAt": dex_paid_at
-            })
+def poll_latest_profiles():
+    """
+    One poll of the latest-profiles feed: returns the entries worth inspecting and updates the poller.
+    """
+    poller.start_poll()
+    token_profiles = get_latest_token_profiles()
+    if not token_profiles:
+        poller.observe(0)
+        return []
 
-            threading.Thread(target=track_price_changes, args=(token_address, token_name), daemon=True).start()
-            
-            dex_paid_sniped += 1
-            latest_dex_paid_time = datetime.now()
+    token_profiles = feed_differ.diff(token_profiles, recheck=profile_needs_recheck)
+    poller.observe(feed_differ.last_poll["new"])
+    return token_profiles
 
 
 # Main execution loop
 def main():
-    print("Dex Paid Token Bot Started...")
+    logger.info("Dex Paid Token Bot Started...")
+    if ASYNC_INGESTION:
+        asyncio.run(main_async())
+        return
+
+    while True:
+        with metrics.timer("scan_loop_iteration_seconds"):
+            token_profiles = poll_latest_profiles()
+            if token_profiles:
+                inspect_token_profiles(token_profiles)
+        time.sleep(poller.next_delay())
+
+async def main_async():
     while True:
-        token_profiles = get_latest_token_profiles()
+        start = time.monotonic()
+        token_profiles = await asyncio.to_thread(poll_latest_profiles)
         if token_profiles:
-            inspect_token_profiles(token_profiles)
-        time.sleep(1)
+            await inspect_token_profiles_async(token_profiles)
+        metrics.observe("scan_loop_iteration_seconds", time.monotonic() - start)
+        await asyncio.sleep(poller.next_delay())
+
+
+def latest_dex_paid_timestamp():
+    return latest_dex_paid_time.timestamp() if latest_dex_paid_time else None
+
+
+# Live values, read at scrape time
+metrics.gauge("tokens_scanned_total", "Token profiles inspected since start.", lambda: tokens_scanned, kind="counter")
+metrics.gauge("dex_paid_sniped_total", "DEX-paid tokens detected since start.", lambda: dex_paid_sniped, kind="counter")
+metrics.gauge("latest_dex_paid_timestamp_seconds", "Unix time of the most recent DEX-paid detection.", latest_dex_paid_timestamp)
+metrics.gauge("tracking_jobs_active", "Price tracking and maintenance jobs currently scheduled.", tracking_scheduler.job_count)
+metrics.gauge("tracking_scheduler_lag_seconds", "How far behind schedule the most overdue tracking tick is.", tracking_scheduler.lag)
+metrics.gauge("pair_resolution_jobs_active", "Paid tokens waiting on deferred pair resolution.", lambda: pair_resolution_queue.stats()["pending"])
+metrics.gauge("price_buffer_rows", "Price ticks buffered for the next batch write.", lambda: price_writer.stats()["buffered"])
+metrics.gauge("db_pool_checkouts_total", "Database connections handed out by the pool.", lambda: db_pool.stats()["checkouts"], kind="counter")
+metrics.gauge("db_pool_connections_opened_total", "Database connections the pool has opened.", lambda: db_pool.stats()["connects"], kind="counter")
+metrics.gauge("db_pool_wait_max_seconds", "Longest wait for a pooled database connection.", lambda: db_pool.stats()["wait_max_seconds"])
+metrics.gauge("ath_tracked_tokens", "Tokens tracked for ATH, by refresh tier.", ath_scheduler.tier_counts, label="tier")
+metrics.gauge("ath_refreshes_total", "Token market cap refreshes for ATH tracking.", lambda: ath_scheduler.refreshed, kind="counter")
+metrics.gauge("poll_interval_seconds", "Current delay between latest-profile polls.", lambda: poller.interval)
+metrics.gauge("poll_achieved_interval_seconds", "Time between the last two latest-profile polls.", lambda: poller.last_achieved)
+metrics.gauge("poll_achieved_interval_avg_seconds", "Smoothed time between latest-profile polls.", lambda: poller.avg_achieved)
+metrics.gauge("feed_last_poll_profiles", "Profiles in the last latest-profiles poll, by diff outcome.", lambda: feed_differ.last_poll, label="outcome")
+metrics.gauge("feed_profiles_total", "Profiles seen in latest-profiles polls, by diff outcome.", lambda: feed_differ.totals, kind="counter", label="outcome")
+metrics.gauge("pair_resolution_resolved_total", "Paid tokens whose pairs were resolved.", lambda: pair_resolution_queue.stats()["resolved"], kind="counter")
+metrics.gauge("pair_resolution_gave_up_total", "Paid tokens given up on after every pair lookup came back empty.", lambda: pair_resolution_queue.stats()["gave_up"], kind="counter")
+metrics.gauge("pair_resolution_attempts_total", "Resolved tokens by the number of lookups they needed.", lambda: pair_resolution_queue.stats()["attempts"], kind="counter", label="attempts")
+metrics.gauge("rate_limiter_tokens_available", "Requests left in each endpoint family's bucket.", lambda: rate_limiter.stats()["available"], label="endpoint")
+metrics.gauge("rate_limiter_waits_total", "Requests that waited on the rate limiter.", lambda: rate_limiter.stats()["waits"], kind="counter")
+metrics.gauge("rate_limiter_wait_seconds_total", "Time spent waiting on the rate limiter.", lambda: rate_limiter.stats()["wait_total_seconds"], kind="counter")
+metrics.gauge("rate_limiter_penalties_total", "Retry-After penalties applied after 429s.", lambda: rate_limiter.stats()["penalties"], kind="counter")
+metrics.gauge("http_pool_requests_total", "DexScreener requests sent through the keep-alive pools.", lambda: http_client.pool_stats()["requests"], kind="counter")
+metrics.gauge("http_pool_hits_total", "Requests served on a reused keep-alive connection.", lambda: http_client.pool_stats()["hits"], kind="counter")
+metrics.gauge("http_pool_misses_total", "New connections opened by the keep-alive pools.", lambda: http_client.pool_stats()["misses"], kind="counter")
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="DEX paid token collection bot")
+    parser.add_argument("--record", metavar="PATH", help="log every DexScreener response to a gzipped recording")
+    parser.add_argument("--replay", metavar="PATH", help="serve DexScreener responses from a recording instead of the network")
+    parser.add_argument("--speed", type=float, default=1.0, help="replay speed multiplier; rate limits and detection timers scale with it (default: 1x)")
+    parser.add_argument("--rate-limit-scale", type=float, default=None,
+                        help="multiply RATE_LIMITS, e.g. for a local stand-in (default: the replay speed, else 1)")
+    parser.add_argument("--role", choices=("all", "detector", "worker"), default="all",
+                        help="all: detect and track in one process; detector: detect only and leave tracking to "
+                             "workers; worker: track a leased share of tokens")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="tracking worker processes to start on this host (default: 1 for --role worker, else 0)")
+    args = parser.parse_args(argv)
+    if args.workers is None:
+        args.workers = 1 if args.role == "worker" else 0
+    if args.workers < 0 or (args.role == "worker" and args.workers < 1):
+        parser.error("--workers must be at least 1 for --role worker and not negative otherwise")
+    if (args.record or args.replay) and (args.role == "worker" or args.workers):
+        parser.error("--record and --replay only apply to a single-process run")
+    if args.record and args.replay:
+        parser.error("--record and --replay are mutually exclusive")
+    if args.speed <= 0:
+        parser.error("--speed must be positive")
+    if args.rate_limit_scale is None:
+        # A recording already respected the live limits; scale them with the replay clock
+        args.rate_limit_scale = args.speed if args.replay else 1.0
+    if args.rate_limit_scale <= 0:
+        parser.error("--rate-limit-scale must be positive")
+    if (args.replay or DEXSCREENER_API_BASE_URL != DEXSCREENER_LIVE_API_URL) and not uses_separate_storage():
+        parser.error("replays and stand-in runs must not write to the live tables: set DB_NAME (other than "
+                     f"{LIVE_DB_NAME}) or DB_SCHEMA, and DEDUPE_STATE_FILE (other than {LIVE_DEDUPE_STATE_FILE})")
+    return args
+
+
+def uses_separate_storage():
+    """
+    True when both the database tables and the dedupe file point somewhere other than the live defaults.
+    """
+    separate_tables = DB_NAME != LIVE_DB_NAME or bool(DB_SCHEMA)
+    return separate_tables and os.path.abspath(DEDUPE_STATE_FILE) != os.path.abspath(LIVE_DEDUPE_STATE_FILE)
 
 if __name__ == "__main__":
-    # Start ATH tracking in a separate thread
-    ath_thread = threading.Thread(target=track_ath_market_cap, daemon=True)
-    ath_thread.start()
+    args = parse_args()
+    setup_logging()
+    exit_on_sigterm()
+
+    # Processes on this host share its API quota, each family split among the processes calling it
+    host_detectors = int(args.role != "worker")
+    detector_rate_limits = process_rate_limits("detector", host_detectors, args.workers, args.rate_limit_scale)
+    worker_rate_limits = process_rate_limits("worker", host_detectors, args.workers, args.rate_limit_scale)
+    own_rate_limits = worker_rate_limits if args.role == "worker" else detector_rate_limits
+    if own_rate_limits != (RATE_LIMITS, RATE_LIMIT_DEFAULT):
+        set_rate_limits(*own_rate_limits)
+        logger.info("🚦 Rate limits per minute for this process: %s", own_rate_limits[0])
+    if DEXSCREENER_API_BASE_URL != DEXSCREENER_LIVE_API_URL:
+        logger.info("🔀 Using DexScreener API at %s", DEXSCREENER_API_BASE_URL)
+    if uses_separate_storage():
+        logger.info("🗄️ Storing to database %s%s and %s", DB_NAME, f" (schema {DB_SCHEMA})" if DB_SCHEMA else "",
+                    DEDUPE_STATE_FILE)
+
+    if args.replay:
+        replay_client = http_client = ReplayHTTPClient(args.replay, speed=args.speed)
+        if args.speed != 1.0:
+            set_timer_speed(args.speed)
+        atexit.register(lambda: logger.info("⏪ Replay stats: %s", replay_client.stats()))
+        logger.info("⏪ Replaying %s at %gx (%d URLs, %.0fs recorded)",
+                    args.replay, args.speed, replay_client.stats()["urls"], replay_client.duration)
+    elif args.record:
+        http_client = TrafficRecorder(http_client, args.record)
+        atexit.register(http_client.close)
+        logger.info("⏺️ Recording DexScreener traffic to %s", args.record)
+    init_db()
+
+    if args.role == "worker":
+        # This process is worker 0; any extra workers get their own processes
+        start_tracking_workers(args.workers - 1, worker_rate_limits, first_index=1)
+        run_tracking_worker(0, worker_rate_limits)
+
+    if METRICS_PORT is not None:
+        start_metrics_server()
+    if args.workers:
+        start_tracking_workers(args.workers, worker_rate_limits)
+    sharded_tracking = args.role == "detector" or args.workers > 0
+
+    # Warm start: skip tokens handled before the restart without re-hitting the API
+    load_started = time.monotonic()
+    restored = dedupe_store.load(already_paid_dex_tokens)
+    logger.info("♻️ Restored %d known tokens in %.3fs", restored, time.monotonic() - load_started)
+    if not sharded_tracking:
+        # Workers resume their leased tokens themselves
+        logger.info("♻️ Resumed price tracking for %d tokens", resume_price_tracking())
+
+    if PRICE_STORAGE_MODE == "partitioned":
+        tracking_scheduler.schedule("price-partitions", maintain_price_partitions,
+                                    interval=PRICE_MAINTENANCE_INTERVAL, delay=PRICE_MAINTENANCE_INTERVAL)
+
+    # Start ATH tracking in a separate thread, unless workers own it
+    if not sharded_tracking:
+        ath_thread = threading.Thread(target=track_ath_market_cap, daemon=True)
+        ath_thread.start()
 
     # Start the main bot logic here
-    print("🚀 Bot is starting...")
+    logger.info("🚀 Bot is starting...")
     main()  # Replace with your bot's main function
\ No newline at end of file
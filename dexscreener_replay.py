@@ -0,0 +1,214 @@
+"""
+Record-and-replay for DexScreener traffic.
+
+TrafficRecorder wraps the bot's HTTP client and appends every response (URL, status, body,
+timing) to a gzipped JSON-lines log. ReplayHTTPClient serves such a log back, at 1x or
+accelerated speed, without touching the network. Replays write to their own tables and dedupe
+file, never the live ones:
+
+    python collection_bot.py --record launch_day.jsonl.gz
+    DB_SCHEMA=replay DEDUPE_STATE_FILE=replay_dedupe.sqlite3 python collection_bot.py --replay launch_day.jsonl.gz --speed 10
+"""
+import bisect
+import gzip
+import json
+import threading
+import time
+import zlib
+from urllib.parse import urlsplit
+
+import requests
+
+RECORDING_VERSION = 1
+RECORDING_FLUSH_INTERVAL = 1.0  # Seconds between sync flushes, so a crash loses at most this much
+FEED_PATH = "/token-profiles/latest/v1"
+
+
+class TrafficRecorder:
+    """
+    Pass-through HTTP client that logs each exchange to `path` before returning it.
+    Each line is {"t": seconds since recording started, "url", "status", "elapsed", "body"},
+    or {"t", "url", "error", "elapsed"} for requests that raised.
+    """
+
+    def __init__(self, client, path):
+        self.client = client
+        self.path = path
+        self._file = gzip.open(path, "wb")  # Binary, so flush() takes Z_SYNC_FLUSH
+        self._lock = threading.Lock()
+        self._started = time.monotonic()
+        self._last_flush = self._started
+        self.recorded = 0
+        self._write({"version": RECORDING_VERSION, "started_at": time.time()})
+
+    def get(self, url, timeout=5):
+        sent = time.monotonic()
+        try:
+            response = self.client.get(url, timeout=timeout)
+        except requests.exceptions.RequestException as e:
+            self._write({"t": sent - self._started, "url": url, "error": str(e),
+                         "elapsed": time.monotonic() - sent})
+            raise
+
+        entry = {"t": sent - self._started, "url": url, "status": response.status_code,
+                 "elapsed": time.monotonic() - sent, "body": response.text}
+        retry_after = response.headers.get("Retry-After")
+        if retry_after is not None:
+            entry["retry_after"] = retry_after
+        self._write(entry)
+        return response
+
+    def _write(self, entry):
+        line = (json.dumps(entry, separators=(",", ":")) + "\n").encode("utf-8")
+        with self._lock:
+            if self._file.closed:
+                return
+            self._file.write(line)
+            self.recorded += 1
+            now = time.monotonic()
+            if now - self._last_flush >= RECORDING_FLUSH_INTERVAL:
+                self._file.flush(zlib.Z_SYNC_FLUSH)
+                self._last_flush = now
+
+    def pool_stats(self):
+        return self.client.pool_stats()
+
+    def close(self):
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+        self.client.close()
+
+
+class ReplayResponse:
+    """
+    The parts of requests.Response the bot reads.
+    """
+
+    def __init__(self, status_code, text, headers=None):
+        self.status_code = status_code
+        self.text = text
+        self.headers = headers or {}
+
+    @property
+    def content(self):
+        return self.text.encode("utf-8")
+
+    def json(self):
+        return json.loads(self.text)
+
+
+def load_recording(path):
+    """
+    Reads a recording into a list of entries sorted by offset. A truncated tail (crash while
+    recording) is ignored.
+    """
+    entries = []
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        try:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    break  # Partial last line
+                if "url" in entry:
+                    entries.append(entry)
+        except (EOFError, zlib.error):
+            pass
+    entries.sort(key=lambda entry: entry["t"])
+    return entries
+
+
+class ReplayHTTPClient:
+    """
+    Serves a recording in place of the network. The replay clock starts on the first request and
+    runs `speed` times faster than wall time; each URL answers with its latest response recorded
+    at or before the current replay time (its earliest one if asked sooner), after the recorded
+    latency scaled by `speed`. URLs never recorded answer 404.
+    """
+
+    def __init__(self, path, speed=1.0, simulate_latency=True):
+        self.path = path
+        self.speed = speed
+        self.simulate_latency = simulate_latency
+        entries = load_recording(path)
+        self.duration = entries[-1]["t"] if entries else 0.0
+        self._by_url = {}  # url -> ([offsets], [entries])
+        for entry in entries:
+            offsets, recorded = self._by_url.setdefault(entry["url"], ([], []))
+            offsets.append(entry["t"])
+            recorded.append(entry)
+        self._listed_at = self._index_feed(entries)
+        self._lock = threading.Lock()
+        self._started = None
+        self.served = 0
+        self.misses = 0
+        self.finished = False
+
+    @staticmethod
+    def _index_feed(entries):
+        """
+        Replay time at which each token first showed up in a recorded latest-profiles response.
+        """
+        listed_at = {}
+        for entry in entries:
+            if entry.get("status") != 200 or not urlsplit(entry["url"]).path.endswith(FEED_PATH):
+                continue
+            try:
+                profiles = json.loads(entry["body"])
+            except ValueError:
+                continue
+            for profile in profiles if isinstance(profiles, list) else ():
+                if isinstance(profile, dict) and profile.get("tokenAddress"):
+                    listed_at.setdefault(profile["tokenAddress"], entry["t"])
+        return listed_at
+
+    def clock(self):
+        """
+        Current replay time in recorded seconds.
+        """
+        with self._lock:
+            if self._started is None:
+                self._started = time.monotonic()
+            return (time.monotonic() - self._started) * self.speed
+
+    def listed_at(self, token_address):
+        return self._listed_at.get(token_address)
+
+    def get(self, url, timeout=5):
+        now = self.clock()
+        recorded = self._by_url.get(url)
+        if recorded is None:
+            with self._lock:
+                self.misses += 1
+            return ReplayResponse(404, "")
+
+        offsets, entries = recorded
+        entry = entries[max(0, bisect.bisect_right(offsets, now) - 1)]
+        with self._lock:
+            self.served += 1
+            self.finished = now > self.duration
+
+        if self.simulate_latency and entry.get("elapsed"):
+            time.sleep(entry["elapsed"] / self.speed)
+
+        if "error" in entry:
+            raise requests.exceptions.ConnectionError(f"Replayed: {entry['error']}")
+        headers = {"Retry-After": entry["retry_after"]} if "retry_after" in entry else {}
+        return ReplayResponse(entry["status"], entry["body"], headers)
+
+    def pool_stats(self):
+        return {"host_pools": 0, "requests": self.served + self.misses, "hits": 0, "misses": 0}  # No sockets involved
+
+    def stats(self):
+        with self._lock:
+            return {
+                "urls": len(self._by_url),
+                "duration": self.duration,
+                "served": self.served,
+                "misses": self.misses,
+                "finished": self.finished,
+            }
+
+    def close(self):
+        pass
@@ -0,0 +1,366 @@
+"""
+Synthetic local stand-in for the DexScreener endpoints the bot uses, for load testing.
+
+Serves token-profiles/latest/v1, orders/v1/{chain}/{addr}, token-pairs/v1/{chain}/{addr} and
+tokens/v1/{chain}/{addrs} from a simulated market whose launch rate, paid share, latency,
+429 bursts and malformed payloads are configurable. Point the bot at it, with its own tables and
+dedupe file (the bot refuses to run against a stand-in otherwise):
+
+    python dexscreener_standin.py --launch-rate 20 --paid-share 0.3 --burst-every 60
+    DEXSCREENER_API_BASE_URL=http://127.0.0.1:8080 DB_SCHEMA=standin DEDUPE_STATE_FILE=standin_dedupe.sqlite3 \
+        python collection_bot.py --rate-limit-scale 100
+
+GET /stats returns what the stand-in has served so far.
+"""
+import argparse
+import heapq
+import json
+import math
+import os
+import random
+import threading
+import time
+from collections import Counter, OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+BASE58_ALPHABET = "123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz"
+WSOL_ADDRESS = "So11111111111111111111111111111111111111112"
+FEED_SIZE = 30  # Profiles returned by token-profiles/latest, newest first
+MALFORMED_KINDS = ("truncated", "wrong_type", "missing_fields", "html")
+
+
+def random_address(rng):
+    number = int.from_bytes(bytes(rng.getrandbits(8) for _ in range(32)), "big")
+    digits = []
+    while number:
+        number, remainder = divmod(number, 58)
+        digits.append(BASE58_ALPHABET[remainder])
+    return "".join(reversed(digits)) or "1"
+
+
+class SyntheticToken:
+    __slots__ = ("address", "chain_id", "name", "symbol", "listed_at", "paid_at", "pairs_at",
+                 "pair_address", "market_cap", "supply", "priced_at")
+
+    def __init__(self, rng, chain_id, listed_at, paid_at, pairs_at):
+        self.address = random_address(rng)
+        self.chain_id = chain_id
+        self.symbol = "".join(rng.choice("ABCDEFGHIJKLMNOPQRSTUVWXYZ") for _ in range(rng.randint(3, 6)))
+        self.name = f"{self.symbol.title()} Token"
+        self.listed_at = listed_at
+        self.paid_at = paid_at  # None for tokens that never pay
+        self.pairs_at = pairs_at
+        self.pair_address = random_address(rng)
+        self.market_cap = rng.lognormvariate(math.log(20000), 1.0)
+        self.supply = 1_000_000_000
+        self.priced_at = listed_at
+
+
+class SyntheticMarket:
+    """
+    Launches tokens as a Poisson process and answers the bot's endpoints from their state.
+    A token enters the latest-profiles feed when it lists and moves back to the top when it pays,
+    like a profile update does on DexScreener, so paid tokens are seen however fast launches scroll
+    the feed. Time is wall-clock; launches and payments are generated lazily on each request.
+    """
+
+    def __init__(self, launch_rate=0.5, paid_share=0.2, pay_delay=30.0, pair_delay=2.0,
+                 other_chain_share=0.3, chain_id="solana", volatility=0.05, max_tokens=200000, seed=None):
+        self.launch_rate = launch_rate
+        self.paid_share = paid_share
+        self.pay_delay = pay_delay
+        self.pair_delay = pair_delay
+        self.other_chain_share = other_chain_share
+        self.chain_id = chain_id
+        self.volatility = volatility  # Per-second log-volatility of market caps
+        self.max_tokens = max_tokens
+        self.rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._tokens = OrderedDict()  # address -> SyntheticToken, oldest listing first
+        self._feed = OrderedDict()  # address -> None, most recently listed or paid last
+        self._payments = []  # (paid_at, address) heap of payments still to happen
+        self._next_launch = time.time()
+
+    def _advance(self, now):
+        # Launches and payments in time order, so the feed order matches what a poller would have seen
+        while True:
+            next_payment = self._payments[0][0] if self._payments else math.inf
+            if min(self._next_launch, next_payment) > now:
+                return
+            if next_payment < self._next_launch:
+                _, address = heapq.heappop(self._payments)
+                if address in self._tokens:
+                    self._show_in_feed(address)
+            else:
+                self._launch()
+
+    def _launch(self):
+        listed_at = self._next_launch
+        chain_id = self.chain_id if self.rng.random() >= self.other_chain_share else "ethereum"
+        paid_at = listed_at + self.rng.uniform(0, self.pay_delay) if self.rng.random() < self.paid_share else None
+        token = SyntheticToken(self.rng, chain_id, listed_at, paid_at, listed_at + self.pair_delay)
+        self._tokens[token.address] = token
+        if len(self._tokens) > self.max_tokens:
+            self._tokens.popitem(last=False)
+        self._show_in_feed(token.address)
+        if paid_at is not None:
+            heapq.heappush(self._payments, (paid_at, token.address))
+        self._next_launch += self.rng.expovariate(self.launch_rate)
+
+    def _show_in_feed(self, address):
+        self._feed[address] = None
+        self._feed.move_to_end(address)
+        if len(self._feed) > FEED_SIZE:
+            self._feed.popitem(last=False)
+
+    def latest_profiles(self, now):
+        with self._lock:
+            self._advance(now)
+            return [self._profile(self._tokens[address]) for address in reversed(self._feed) if address in self._tokens]
+
+    def orders(self, address, now):
+        with self._lock:
+            self._advance(now)
+            token = self._tokens.get(address)
+            if token is None or token.paid_at is None or token.paid_at > now:
+                return []
+            return [{"type": "tokenProfile", "status": "approved", "paymentTimestamp": int(token.paid_at * 1000)}]
+
+    def pairs(self, addresses, now):
+        with self._lock:
+            self._advance(now)
+            pairs = []
+            for address in addresses:
+                token = self._tokens.get(address)
+                if token is not None and token.pairs_at <= now:
+                    pairs.append(self._pair(token, now))
+            return pairs
+
+    def _profile(self, token):
+        return {
+            "url": f"https://dexscreener.com/{token.chain_id}/{token.address}",
+            "chainId": token.chain_id,
+            "tokenAddress": token.address,
+            "icon": f"https://example.invalid/icons/{token.address}.png",
+            "description": f"{token.name} to the moon",
+            "links": [{"type": "twitter", "url": f"https://x.com/{token.symbol.lower()}"}],
+        }
+
+    def _pair(self, token, now):
+        elapsed = now - token.priced_at
+        if elapsed > 0:
+            token.market_cap *= math.exp(self.rng.gauss(0, self.volatility * math.sqrt(elapsed)))
+            token.priced_at = now
+        price = token.market_cap / token.supply
+        return {
+            "chainId": token.chain_id,
+            "dexId": "raydium",
+            "url": f"https://dexscreener.com/{token.chain_id}/{token.pair_address}",
+            "pairAddress": token.pair_address,
+            "baseToken": {"address": token.address, "name": token.name, "symbol": token.symbol},
+            "quoteToken": {"address": WSOL_ADDRESS, "name": "Wrapped SOL", "symbol": "SOL"},
+            "priceNative": f"{price / 150:.12f}",
+            "priceUsd": f"{price:.12f}",
+            "liquidity": {"usd": round(token.market_cap * 0.1, 2)},
+            "fdv": round(token.market_cap, 2),
+            "marketCap": round(token.market_cap, 2),
+            "pairCreatedAt": int(token.pairs_at * 1000),
+        }
+
+
+class FaultInjector:
+    """
+    Latency, 429 bursts and malformed payloads layered over the market's answers.
+    Latency is lognormal around `latency_median` seconds; every `burst_every` seconds all requests
+    get 429 for `burst_duration` seconds; `malformed_share` of 200s carry a broken body.
+    """
+
+    def __init__(self, latency_median=0.05, latency_sigma=0.5, latency_max=5.0, burst_every=0.0,
+                 burst_duration=5.0, retry_after=2, malformed_share=0.0, seed=None):
+        self.latency_median = latency_median
+        self.latency_sigma = latency_sigma
+        self.latency_max = latency_max
+        self.burst_every = burst_every
+        self.burst_duration = burst_duration
+        self.retry_after = retry_after
+        self.malformed_share = malformed_share
+        self.rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._started = time.monotonic()
+
+    def latency(self):
+        if self.latency_median <= 0:
+            return 0.0
+        with self._lock:
+            sample = self.rng.lognormvariate(math.log(self.latency_median), self.latency_sigma)
+        return min(sample, self.latency_max)
+
+    def rate_limited(self):
+        if self.burst_every <= 0:
+            return False
+        return (time.monotonic() - self._started) % self.burst_every < self.burst_duration
+
+    def malformed_kind(self):
+        with self._lock:
+            if self.rng.random() >= self.malformed_share:
+                return None
+            return self.rng.choice(MALFORMED_KINDS)
+
+
+def malform(payload, kind):
+    """
+    Returns (content_type, body) for a broken version of `payload`.
+    """
+    if kind == "truncated":
+        body = json.dumps(payload)
+        return "application/json", body[:max(1, len(body) // 2)]
+    if kind == "wrong_type":
+        return "application/json", json.dumps({"schemaVersion": "1.0.0", "pairs": payload})
+    if kind == "missing_fields":
+        stripped = [{key: value for key, value in item.items() if key not in ("marketCap", "type", "tokenAddress")}
+                    if isinstance(item, dict) else item for item in payload]
+        return "application/json", json.dumps(stripped)
+    return "text/html", "<html><body>502 Bad Gateway</body></html>"
+
+
+class StandinRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-alive, like the real API, so the bot's pool is exercised
+
+    def do_GET(self):
+        server = self.server
+        path = urlsplit(self.path).path.strip("/")
+        parts = path.split("/")
+        family = parts[0] if parts else ""
+
+        if path == "stats":
+            self._send(200, "application/json", json.dumps(server.stats()))
+            return
+
+        time.sleep(server.faults.latency())
+        now = time.time()
+
+        if path == "token-profiles/latest/v1":
+            payload = server.market.latest_profiles(now)
+        elif family == "orders" and len(parts) == 4:
+            payload = server.market.orders(parts[3], now)
+        elif family == "token-pairs" and len(parts) == 4:
+            payload = server.market.pairs([parts[3]], now)
+        elif family == "tokens" and len(parts) == 4:
+            payload = server.market.pairs(parts[3].split(",")[:30], now)
+        else:
+            server.count(family or "unknown", 404)
+            self._send(404, "application/json", json.dumps({"error": "Not found"}))
+            return
+
+        if server.faults.rate_limited():
+            server.count(family, 429)
+            self._send(429, "application/json", json.dumps({"error": "Too Many Requests"}),
+                       {"Retry-After": str(server.faults.retry_after)})
+            return
+
+        kind = server.faults.malformed_kind()
+        if kind is not None:
+            server.count(family, f"malformed:{kind}")
+            self._send(200, *malform(payload, kind))
+            return
+
+        server.count(family, 200)
+        self._send(200, "application/json", json.dumps(payload))
+
+    def _send(self, status, content_type, body, headers=None):
+        data = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass  # Request logging would dominate at load-test rates; see /stats
+
+
+class StandinServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, market, faults):
+        super().__init__(address, StandinRequestHandler)
+        self.market = market
+        self.faults = faults
+        self._counts = Counter()
+        self._counts_lock = threading.Lock()
+        self.started = time.time()
+
+    def count(self, family, outcome):
+        with self._counts_lock:
+            self._counts[f"{family} {outcome}"] += 1
+
+    def stats(self):
+        with self._counts_lock:
+            counts = dict(self._counts)
+        uptime = time.time() - self.started
+        return {
+            "uptime_seconds": round(uptime, 1),
+            "requests": sum(counts.values()),
+            "requests_per_second": round(sum(counts.values()) / uptime, 2) if uptime else 0.0,
+            "responses": counts,
+        }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Local DexScreener stand-in for load testing")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=int(os.environ.get("DEXSCREENER_STANDIN_PORT", 8080)))
+    parser.add_argument("--launch-rate", type=float, default=0.5, help="token launches per second")
+    parser.add_argument("--paid-share", type=float, default=0.2, help="share of launches that pay for a profile")
+    parser.add_argument("--pay-delay", type=float, default=30.0, help="paid tokens pay within this many seconds of listing, and then reappear at the top of the feed")
+    parser.add_argument("--pair-delay", type=float, default=2.0, help="seconds after listing before pairs appear")
+    parser.add_argument("--other-chain-share", type=float, default=0.3, help="share of launches on chains the bot skips")
+    parser.add_argument("--latency-median", type=float, default=0.05, help="median response latency in seconds")
+    parser.add_argument("--latency-sigma", type=float, default=0.5, help="lognormal sigma of the latency")
+    parser.add_argument("--latency-max", type=float, default=5.0, help="latency cap in seconds")
+    parser.add_argument("--burst-every", type=float, default=0.0, help="start a 429 burst every N seconds (0 disables)")
+    parser.add_argument("--burst-duration", type=float, default=5.0, help="length of each 429 burst in seconds")
+    parser.add_argument("--retry-after", type=int, default=2, help="Retry-After sent with 429s")
+    parser.add_argument("--malformed-share", type=float, default=0.0, help="share of 200 responses with a broken body")
+    parser.add_argument("--max-tokens", type=int, default=200000, help="tokens kept before the oldest are forgotten")
+    parser.add_argument("--seed", type=int, default=None, help="seed for a reproducible market")
+    args = parser.parse_args(argv)
+    if args.launch_rate <= 0:
+        parser.error("--launch-rate must be positive")
+    for option in ("paid_share", "other_chain_share", "malformed_share"):
+        if not 0.0 <= getattr(args, option) <= 1.0:
+            parser.error(f"--{option.replace('_', '-')} must be between 0 and 1")
+    for option in ("pay_delay", "pair_delay", "latency_sigma", "latency_max", "burst_every", "burst_duration", "retry_after"):
+        if getattr(args, option) < 0:
+            parser.error(f"--{option.replace('_', '-')} must not be negative")
+    if args.max_tokens < 1:
+        parser.error("--max-tokens must be at least 1")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    market = SyntheticMarket(launch_rate=args.launch_rate, paid_share=args.paid_share, pay_delay=args.pay_delay,
+                             pair_delay=args.pair_delay, other_chain_share=args.other_chain_share,
+                             max_tokens=args.max_tokens, seed=args.seed)
+    faults = FaultInjector(latency_median=args.latency_median, latency_sigma=args.latency_sigma,
+                           latency_max=args.latency_max, burst_every=args.burst_every,
+                           burst_duration=args.burst_duration, retry_after=args.retry_after,
+                           malformed_share=args.malformed_share,
+                           seed=None if args.seed is None else args.seed + 1)
+    server = StandinServer((args.host, args.port), market, faults)
+    print(f"DexScreener stand-in listening on http://{args.host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(json.dumps(server.stats(), indent=2))
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
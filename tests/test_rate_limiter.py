@@ -0,0 +1,77 @@
+import os
+import sys
+import threading
+import time
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from collection_bot import PRIORITY_BACKGROUND, PRIORITY_DETECTION, PRIORITY_TRACKING, RateLimiter
+
+
+def acquire_within(limiter, family, priority, timeout):
+    """
+    Runs acquire() on a daemon thread; returns the seconds waited, or None if it was still blocked after `timeout`.
+    """
+    result = []
+    thread = threading.Thread(target=lambda: result.append(limiter.acquire(family, priority)), daemon=True)
+    thread.start()
+    thread.join(timeout)
+    return result[0] if result else None
+
+
+class RateLimiterLaneTests(unittest.TestCase):
+    def test_lanes_take_tokens_until_their_reserve(self):
+        # 60/min with 10s of burst: a full bucket of 10 tokens, refilling one per second
+        limiter = RateLimiter(limits={"x": 60}, burst_seconds=10)
+        for _ in range(5):
+            self.assertLess(limiter.acquire("x", PRIORITY_BACKGROUND), 0.05)
+        # Background leaves half the bucket for the other lanes...
+        self.assertIsNone(acquire_within(limiter, "x", PRIORITY_BACKGROUND, 0.3))
+
+    def test_higher_lanes_use_what_lower_lanes_leave(self):
+        limiter = RateLimiter(limits={"x": 60}, burst_seconds=10)
+        for _ in range(5):
+            limiter.acquire("x", PRIORITY_BACKGROUND)
+        for _ in range(3):
+            self.assertLess(limiter.acquire("x", PRIORITY_TRACKING), 0.05)
+        for _ in range(2):
+            self.assertLess(limiter.acquire("x", PRIORITY_DETECTION), 0.05)
+
+    def test_reserved_lanes_still_acquire_from_a_one_token_bucket(self):
+        # 6/min clamps the bucket to a single token; the reserve must not lock the lower lanes out
+        for priority in (PRIORITY_TRACKING, PRIORITY_BACKGROUND):
+            limiter = RateLimiter(limits={"x": 6}, burst_seconds=10)
+            self.assertIsNotNone(acquire_within(limiter, "x", priority, 1.0))
+
+    def test_families_have_separate_buckets(self):
+        limiter = RateLimiter(limits={"x": 6, "y": 6}, burst_seconds=10)
+        limiter.acquire("x")
+        self.assertLess(limiter.acquire("y"), 0.05)
+
+
+class RateLimiterRetryAfterTests(unittest.TestCase):
+    def test_penalize_blocks_the_family_until_retry_after(self):
+        limiter = RateLimiter(limits={"x": 6000}, burst_seconds=10)
+        limiter.penalize("x", 0.3)
+        self.assertGreater(limiter.blocked_for("x"), 0.2)
+        start = time.monotonic()
+        limiter.acquire("x")
+        self.assertGreaterEqual(time.monotonic() - start, 0.25)
+        self.assertEqual(limiter.blocked_for("x"), 0.0)
+
+    def test_penalize_leaves_other_families_alone(self):
+        limiter = RateLimiter(limits={"x": 6000, "y": 6000}, burst_seconds=10)
+        limiter.penalize("x", 5)
+        self.assertLess(limiter.acquire("y"), 0.05)
+
+    def test_penalize_empties_the_bucket(self):
+        # After the Retry-After the family restarts from an empty bucket instead of bursting
+        limiter = RateLimiter(limits={"x": 60}, burst_seconds=10)
+        limiter.penalize("x", 0.1)
+        limiter.acquire("x")  # Waits out the Retry-After, then ~1s for the first token at 1/s
+        self.assertIsNone(acquire_within(limiter, "x", PRIORITY_DETECTION, 0.3))
+
+
+if __name__ == "__main__":
+    unittest.main()